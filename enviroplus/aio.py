@@ -0,0 +1,112 @@
+"""Awaitable sensor reads for asyncio applications.
+
+Every read in enviroplus blocks on I2C, serial or audio I/O. The coroutines
+here offload that work to worker threads so the event loop keeps running.
+
+Each device gets its own single-thread executor: reads of the same device
+queue up behind each other, while different devices are polled concurrently.
+
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import gas
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(device):
+    with _executors_lock:
+        executor = _executors.get(device)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"enviroplus-{device}")
+            _executors[device] = executor
+        return executor
+
+
+async def run(device, func, *args, **kwargs):
+    """Run a blocking call on the worker thread for device and await the result.
+
+    :param device: Name of the device, calls sharing a name never run concurrently
+    :param func: Blocking callable to run
+
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(device), functools.partial(func, *args, **kwargs))
+
+
+def shutdown(wait=True):
+    """Shut down all worker threads."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+async def read_all_async():
+    """Return gas resistance for oxidising, reducing and NH3, see gas.read_all()."""
+    return await run("gas", gas.read_all)
+
+
+async def read_channels_async(channels):
+    """Return gas resistance for a subset of channels, see gas.read_channels()."""
+    return await run("gas", gas.read_channels, channels)
+
+
+async def get_noise_profile_async(noise, *args, **kwargs):
+    """Return a noise characteristic profile, see Noise.get_noise_profile().
+
+    :param noise: enviroplus.noise.Noise instance
+
+    """
+    return await run("noise", noise.get_noise_profile, *args, **kwargs)
+
+
+async def get_amplitudes_at_frequency_ranges_async(noise, ranges):
+    """Return the mean amplitude of frequencies in the given ranges, see Noise.get_amplitudes_at_frequency_ranges().
+
+    :param noise: enviroplus.noise.Noise instance
+    :param ranges: List of ranges including a start and end range
+
+    """
+    return await run("noise", noise.get_amplitudes_at_frequency_ranges, ranges)
+
+
+async def read_pms5003_async(pms5003):
+    """Return the next frame from a PMS5003.
+
+    :param pms5003: pms5003.PMS5003 instance
+
+    """
+    return await run("pms5003", pms5003.read)
+
+
+def _read_bme280(bme280):
+    return bme280.get_temperature(), bme280.get_pressure(), bme280.get_humidity()
+
+
+async def read_bme280_async(bme280):
+    """Return temperature, pressure and humidity from a BME280.
+
+    :param bme280: bme280.BME280 instance
+
+    """
+    return await run("bme280", _read_bme280, bme280)
+
+
+def _read_ltr559(ltr559):
+    return ltr559.get_lux(), ltr559.get_proximity()
+
+
+async def read_ltr559_async(ltr559):
+    """Return light level and proximity from an LTR559.
+
+    :param ltr559: ltr559.LTR559 instance
+
+    """
+    return await run("ltr559", _read_ltr559, ltr559)
@@ -0,0 +1,97 @@
+"""Icons and fonts for the LCD examples, loaded once and kept in memory.
+
+Image.open() reads and decodes a PNG, and ImageFont.truetype() reads and
+parses a font file, so doing either per frame puts file I/O in every
+redraw. Assets keeps the decoded icons and each font size it has loaded,
+so rendering a frame only touches memory.
+
+    assets = Assets()
+    assets.load_icons()
+    img.paste(assets.icon("temperature"), (3, 18), mask=assets.icon("temperature"))
+    ImageDraw.Draw(img).text((0, 0), "Hello", font=assets.font(14))
+
+"""
+
+import os
+import threading
+
+from fonts.ttf import RobotoMedium
+from PIL import Image, ImageFont
+
+ICON_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "examples", "icons")
+
+_assets = None
+_assets_lock = threading.Lock()
+
+
+class Assets:
+    def __init__(self, icon_path=ICON_PATH, font_path=RobotoMedium):
+        """Icon and font cache.
+
+        :param icon_path: Directory of .png icons
+        :param font_path: TrueType font file, default Roboto Medium from font-roboto
+
+        """
+        self.icon_path = icon_path
+        self.font_path = font_path
+        self._icons = {}
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def load_icons(self):
+        """Load every icon in icon_path, so none are loaded mid-frame."""
+        for filename in sorted(os.listdir(self.icon_path)):
+            name, extension = os.path.splitext(filename)
+            if extension == ".png":
+                self.icon(name)
+
+    def icon(self, name):
+        """Return an icon as a decoded RGBA image, ready to paste with itself as the mask.
+
+        The image is shared, copy it before drawing on it.
+
+        :param name: Icon file name without .png, eg: "humidity-good"
+
+        """
+        icon = self._icons.get(name)
+        if icon is None:
+            with self._lock:
+                icon = self._icons.get(name)
+                if icon is None:
+                    with Image.open(os.path.join(self.icon_path, f"{name}.png")) as image:
+                        # Image.open() is lazy, convert() decodes the PNG so the file can be closed
+                        icon = self._icons[name] = image.convert("RGBA")
+        return icon
+
+    def font(self, size):
+        """Return the font at size, loading it on first use.
+
+        :param size: Font size in pixels
+
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            with self._lock:
+                font = self._fonts.get(size)
+                if font is None:
+                    font = self._fonts[size] = ImageFont.truetype(self.font_path, size)
+        return font
+
+
+def get_assets():
+    """Return the shared Assets, with the default icons and font."""
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = Assets()
+    return _assets
+
+
+def get_icon(name):
+    """Return an icon from the shared Assets, see Assets.icon()."""
+    return get_assets().icon(name)
+
+
+def get_font(size):
+    """Return a font size from the shared Assets, see Assets.font()."""
+    return get_assets().font(size)
@@ -0,0 +1,280 @@
+"""Audio sources for enviroplus.noise.
+
+A source supplies mono audio to Noise. DeviceSource records from the ADAU7002
+microphone, FileSource replays a WAV or .npy recording and ToneSource generates
+synthetic test signals. File and tone sources let the analysis run on any
+machine, and faster than real time. sounddevice, and with it PortAudio, is
+only imported once a DeviceSource is used.
+
+Sources implement:
+
+* check_sample_rate(sample_rate) - raise ValueError if the rate is not usable
+* read(count, sample_rate, dtype) - return the next count frames as a (count, 1) array
+* open_stream(sample_rate, dtype, callback, finished_callback) - return a stream with start(), stop()
+  and close() that calls callback(indata, frames, time, status) like sounddevice.InputStream,
+  and finished_callback() once it stops for any reason, eg: at the end of a file
+
+"""
+
+import struct
+import threading
+import time
+
+import numpy
+
+# Sample rates supported by the ADAU7002 codec driver
+SAMPLE_RATES = (8000, 11025, 16000, 22050, 32000, 44100, 48000, 64000, 88200, 96000)
+
+# Sample formats, with the scale that maps them to +-1.0
+SAMPLE_FORMATS = {
+    "float32": None,
+    "float64": None,
+    "int16": 1.0 / (1 << 15),
+    "int32": 1.0 / (1 << 31),
+}
+
+
+def to_float(recording, dtype):
+    """Return a recording in dtype as floating point scaled to +-1.0."""
+    scale = SAMPLE_FORMATS[dtype]
+    if scale is not None:
+        recording = recording.astype(numpy.float32)
+        recording *= scale
+    return recording
+
+
+def convert(data, dtype):
+    """Return a copy of data converted to the sample format dtype."""
+    source = numpy.dtype(data.dtype).name
+    if source == dtype:
+        return numpy.array(data)
+
+    data = to_float(data, source)
+    scale = SAMPLE_FORMATS[dtype]
+    if scale is None:
+        return data.astype(dtype)
+
+    limit = 1.0 / scale
+    return numpy.clip(numpy.rint(data * limit), -limit, limit - 1).astype(dtype)
+
+
+class DeviceSource:
+    def __init__(self, device="adau7002"):
+        """Record from a sound device.
+
+        :param device: sounddevice device name or index
+
+        """
+        self.device = device
+
+    def check_sample_rate(self, sample_rate):
+        if sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"sample_rate must be one of {', '.join(str(rate) for rate in SAMPLE_RATES)}")
+
+    def read(self, count, sample_rate, dtype):
+        import sounddevice
+
+        return sounddevice.rec(count, device=self.device, samplerate=sample_rate, blocking=True, channels=1, dtype=dtype)
+
+    def open_stream(self, sample_rate, dtype, callback, finished_callback=None):
+        import sounddevice
+
+        return sounddevice.InputStream(device=self.device, samplerate=sample_rate, channels=1, dtype=dtype, callback=callback, finished_callback=finished_callback)
+
+
+class _BufferSource:
+    """Base for sources that produce audio on demand rather than from a device."""
+
+    blocksize = 1024
+
+    def check_sample_rate(self, sample_rate):
+        pass
+
+    def open_stream(self, sample_rate, dtype, callback, finished_callback=None):
+        return _SourceStream(self, sample_rate, dtype, callback, finished_callback)
+
+    def _read_block(self, count, sample_rate, dtype):
+        """Return the next block for a stream, raising EOFError once there are none left."""
+        return self.read(count, sample_rate, dtype)
+
+
+class FileSource(_BufferSource):
+    def __init__(self, path, sample_rate=None, loop=False, realtime=True):
+        """Replay a WAV or .npy recording.
+
+        The file is memory-mapped, so long recordings are not loaded into memory.
+        Only the first channel is used. WAV files may be 16 or 32-bit PCM or 32 or
+        64-bit float. .npy files must hold one of those formats and need sample_rate.
+
+        :param path: Path to a .wav or .npy file
+        :param sample_rate: Sample rate in Hz, required for .npy files
+        :param loop: Start again from the beginning at the end of the file, otherwise raise EOFError
+        :param realtime: When streaming, deliver audio at its real rate rather than as fast as possible
+
+        """
+        self.path = str(path)
+        self.loop = loop
+        self.realtime = realtime
+        self.position = 0
+
+        if self.path.endswith(".npy"):
+            if sample_rate is None:
+                raise ValueError("sample_rate is required for .npy files")
+            data = numpy.load(self.path, mmap_mode="r")
+            self.sample_rate = sample_rate
+        else:
+            data, self.sample_rate = _map_wav(self.path)
+            if sample_rate is not None and sample_rate != self.sample_rate:
+                raise ValueError(f"{self.path} has a sample rate of {self.sample_rate}Hz, not {sample_rate}Hz")
+
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        if numpy.dtype(data.dtype).name not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format {data.dtype}")
+
+        self.data = data[:, :1]
+
+    def __len__(self):
+        return len(self.data)
+
+    def check_sample_rate(self, sample_rate):
+        if sample_rate != self.sample_rate:
+            raise ValueError(f"sample_rate must match the file, {self.sample_rate}Hz")
+
+    def read(self, count, sample_rate, dtype):
+        end = self.position + count
+        if end <= len(self.data):
+            block = self.data[self.position : end]
+        elif self.loop and len(self.data) > 0:
+            index = numpy.arange(self.position, end) % len(self.data)
+            block = self.data[index]
+        else:
+            raise EOFError(f"End of {self.path}")
+
+        self.position = end % len(self.data) if self.loop else end
+        return convert(block, dtype)
+
+    def _read_block(self, count, sample_rate, dtype):
+        # Stream the short last block of the file too, before ending
+        if not self.loop and self.position < len(self.data):
+            count = min(count, len(self.data) - self.position)
+        return self.read(count, sample_rate, dtype)
+
+
+class ToneSource(_BufferSource):
+    def __init__(self, frequencies=(1000.0,), amplitude=0.5, noise=0.0, seed=None, realtime=True):
+        """Generate a sum of sine waves with optional white noise.
+
+        Phase carries on from one read to the next, so consecutive reads are continuous.
+
+        :param frequencies: Tone frequencies in Hz
+        :param amplitude: Peak amplitude of each tone, relative to full scale
+        :param noise: Standard deviation of added white noise, relative to full scale
+        :param seed: Seed for the noise generator
+        :param realtime: When streaming, deliver audio at its real rate rather than as fast as possible
+
+        """
+        self.frequencies = numpy.asarray(frequencies, dtype=numpy.float64)
+        self.amplitude = amplitude
+        self.noise = noise
+        self.realtime = realtime
+        self.position = 0
+        self._random = numpy.random.default_rng(seed)
+
+    def read(self, count, sample_rate, dtype):
+        t = (self.position + numpy.arange(count)) / float(sample_rate)
+        self.position += count
+
+        signal = self.amplitude * numpy.sin(2 * numpy.pi * numpy.outer(t, self.frequencies)).sum(axis=1)
+        if self.noise:
+            signal += self.noise * self._random.standard_normal(count)
+
+        return convert(signal.reshape(-1, 1), dtype)
+
+
+class _SourceStream:
+    """Feed a buffer source to a stream callback from a background thread."""
+
+    def __init__(self, source, sample_rate, dtype, callback, finished_callback=None):
+        self._source = source
+        self._sample_rate = sample_rate
+        self._dtype = dtype
+        self._callback = callback
+        self._finished_callback = finished_callback
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="enviroplus-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop()
+
+    def _run(self):
+        blocksize = self._source.blocksize
+        interval = blocksize / float(self._sample_rate)
+        next_time = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    block = self._source._read_block(blocksize, self._sample_rate, self._dtype)
+                except EOFError:
+                    return
+                self._callback(block, len(block), None, None)
+
+                if self._source.realtime:
+                    next_time += interval
+                    self._stopped.wait(max(0.0, next_time - time.monotonic()))
+        finally:
+            # At the end of the file, on stop() or if the callback raised, as sounddevice does
+            if self._finished_callback is not None:
+                self._finished_callback()
+
+
+def _map_wav(path):
+    """Memory-map the sample data of a WAV file, returning it with the sample rate."""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk, size = struct.unpack("<4sI", header)
+            if chunk == b"fmt ":
+                fmt = f.read(size)
+                if size % 2:
+                    f.read(1)
+            elif chunk == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(size + size % 2, 1)
+
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk")
+
+    audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if audio_format == 0xFFFE and len(fmt) >= 26:
+        # WAVE_FORMAT_EXTENSIBLE, the real format is the first field of the sub-format GUID
+        audio_format = struct.unpack("<H", fmt[24:26])[0]
+
+    formats = {(1, 16): "<i2", (1, 32): "<i4", (3, 32): "<f4", (3, 64): "<f8"}
+    if (audio_format, bits) not in formats:
+        raise ValueError(f"Unsupported WAV format {audio_format} with {bits} bits per sample")
+
+    dtype = numpy.dtype(formats[(audio_format, bits)])
+    frames = size // (dtype.itemsize * channels)
+    data = numpy.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels))
+    return data, sample_rate
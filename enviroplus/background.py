@@ -0,0 +1,108 @@
+"""Base for sensors read continuously on a background thread.
+
+BackgroundReader runs a subclass's _run() loop on a daemon thread and keeps
+what it publishes, with the monotonic time it arrived, in a bounded ring
+buffer. Consumers get the latest item straight away, or wait for one.
+
+"""
+
+import collections
+import logging
+import threading
+import time
+
+
+class BackgroundReader:
+    def __init__(self, size, name):
+        """Set up a reader, see start().
+
+        :param size: Number of items to keep, the oldest are discarded once it is full
+        :param name: Thread name
+
+        """
+        self.name = name
+        self.errors = 0
+        self._items = collections.deque(maxlen=size)
+        self._count = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._logger = logging.getLogger(type(self).__module__)
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Start reading on the background thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._main, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop reading, waits for a read in progress to finish."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def latest(self, wait=False, timeout=None, max_age=None):
+        """Return the most recent item.
+
+        :param wait: Block until an item is available, otherwise return None
+        :param timeout: Maximum time, in seconds, to wait
+        :param max_age: Only return an item that arrived in the last max_age seconds
+
+        """
+        with self._condition:
+            if wait and not self._live(max_age):
+                self._condition.wait_for(lambda: self._live(max_age) or not self._running, timeout)
+            if self._live(max_age):
+                return self._items[-1][1]
+            return None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _live(self, max_age):
+        if not self._items:
+            return False
+        return max_age is None or time.monotonic() - self._items[-1][0] <= max_age
+
+    def _main(self):
+        try:
+            self._run()
+        finally:
+            # Also reached if _run() raised, so waiters see running go False
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+
+    def _run(self):
+        """Read until running is False, passing each result to _publish()."""
+        raise NotImplementedError
+
+    def _publish(self, item):
+        with self._condition:
+            self._items.append((time.monotonic(), item))
+            self._count += 1
+            self._condition.notify_all()
+
+    def _wait(self, delay):
+        """Sleep for delay seconds, returning early if stop() is called."""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._running, delay)
+
+    def _error(self, message, error):
+        self.errors += 1
+        self._logger.warning(message, error)
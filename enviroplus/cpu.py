@@ -0,0 +1,77 @@
+"""Read the Raspberry Pi CPU temperature, used to compensate the BME280.
+
+The sysfs thermal zone file is opened once and re-read with os.pread, so a
+reading costs one system call rather than an open/read/close, or a fork and
+exec of vcgencmd.
+
+"""
+
+import os
+import threading
+import time
+
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+_sensor = None
+_sensor_lock = threading.Lock()
+
+
+class CPUTemperature:
+    def __init__(self, path=THERMAL_ZONE, max_age=None):
+        """Read a sysfs thermal zone.
+
+        :param path: Thermal zone temp file, reporting millidegrees Celsius
+        :param max_age: Seconds a reading may be reused for, None (default) to read every time
+
+        """
+        self.path = path
+        self.max_age = max_age
+        self._fd = None
+        self._value = None
+        self._timestamp = None
+        self._lock = threading.Lock()
+
+    def read(self, max_age=None):
+        """Return the CPU temperature in degrees Celsius.
+
+        :param max_age: Seconds a cached reading may be reused for, overrides the max_age set in the constructor
+
+        """
+        if max_age is None:
+            max_age = self.max_age
+
+        with self._lock:
+            if max_age is not None and self._timestamp is not None and time.monotonic() - self._timestamp <= max_age:
+                return self._value
+
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            # sysfs attributes are regenerated on every read from offset 0
+            self._value = int(os.pread(self._fd, 16, 0)) / 1000.0
+            self._timestamp = time.monotonic()
+            return self._value
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_cpu_temperature(max_age=None):
+    """Return the CPU temperature in degrees Celsius from a shared, open, thermal zone.
+
+    :param max_age: Seconds a cached reading may be reused for, None (default) to read every time
+
+    """
+    global _sensor
+    with _sensor_lock:
+        if _sensor is None:
+            _sensor = CPUTemperature()
+    return _sensor.read(max_age)
@@ -0,0 +1,81 @@
+"""Render graphs for the 0.96" ST7735 LCD as NumPy arrays.
+
+The examples draw a strip chart of recent readings: one column per reading,
+coloured from blue (low) to red (high), with a black line tracing the value.
+StripChart builds the whole frame as one RGB array, with colours looked up in
+a precomputed hue table, instead of two PIL draw calls per column.
+
+    chart = StripChart(160, 80, top=25)
+    image = Image.fromarray(chart.render(readings))
+    ImageDraw.Draw(image).text((0, 0), "temp: 21.5 C", font=font, fill=(0, 0, 0))
+    st7735.display(image)
+
+"""
+
+import colorsys
+
+import numpy
+
+LUT_SIZE = 256
+
+
+def _hue_lut(size=LUT_SIZE):
+    """Return a (size, 3) uint8 table running from blue (index 0) to red (index size - 1)."""
+    levels = numpy.linspace(0.0, 1.0, size)
+    return numpy.array([[int(x * 255.0) for x in colorsys.hsv_to_rgb((1.0 - level) * 0.6, 1.0, 1.0)] for level in levels], dtype=numpy.uint8)
+
+
+HUE_LUT = _hue_lut()
+
+
+class StripChart:
+    def __init__(self, width=160, height=80, top=25, background=(255, 255, 255), line=(0, 0, 0)):
+        """Strip chart renderer.
+
+        :param width: Width in pixels, one column per reading
+        :param height: Height in pixels
+        :param top: Rows at the top left as background, for a text label
+        :param background: RGB colour above the chart
+        :param line: RGB colour of the value line
+
+        """
+        self.width = width
+        self.height = height
+        self.top = top
+        self.background = numpy.array(background, dtype=numpy.uint8)
+        self.line = numpy.array(line, dtype=numpy.uint8)
+        self._frame = numpy.empty((height, width, 3), dtype=numpy.uint8)
+        self._rows = numpy.arange(height)[:, numpy.newaxis]
+
+    def render(self, values, vmin=None, vmax=None):
+        """Return a (height, width, 3) uint8 RGB frame charting values.
+
+        Values are scaled between their min and max. The most recent width
+        values are drawn, oldest on the left. The frame is reused by the next call.
+
+        :param values: Sequence of readings, oldest first
+        :param vmin: Minimum of values if already known, eg: from History.min()
+        :param vmax: Maximum of values if already known, eg: from History.max()
+
+        """
+        values = numpy.asarray(values, dtype=numpy.float64)[-self.width :]
+        count = len(values)
+
+        frame = self._frame
+        frame[:] = self.background
+        if count == 0:
+            return frame
+
+        if vmin is None:
+            vmin = values.min()
+        if vmax is None:
+            vmax = values.max()
+        levels = (values - vmin + 1) / (vmax - vmin + 1)
+
+        frame[self.top :, :count] = HUE_LUT[numpy.rint(levels * (LUT_SIZE - 1)).astype(numpy.intp)]
+
+        line_y = (self.height - levels * (self.height - self.top)).astype(numpy.intp)
+        mask = (self._rows == line_y) | (self._rows == line_y + 1)
+        frame[:, :count][mask] = self.line
+
+        return frame
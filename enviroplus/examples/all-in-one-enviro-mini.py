@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-import colorsys
 import os
 import sys
 import time
@@ -16,12 +15,15 @@ except ImportError:
     import ltr559
 
 import logging
-from subprocess import PIPE, Popen
 
 from bme280 import BME280
 from fonts.ttf import RobotoMedium as UserFont
 from PIL import Image, ImageDraw, ImageFont
 
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.display import StripChart
+from enviroplus.history import History
+
 logging.basicConfig(format="%(asctime)s.%(msecs)03d %(levelname)-8s %(message)s", level=logging.INFO, datefmt="%Y-%m-%d %H:%M:%S")
 
 logging.info("""all-in-one.py - Displays readings from all of Enviro plus" sensors
@@ -53,44 +55,29 @@ message = ""
 top_pos = 25
 
 
+# Strip chart of the selected variable, below the text
+chart = StripChart(WIDTH, HEIGHT, top_pos)
+
+
 # Displays data and text on the 0.96" LCD
 def display_text(variable, data, unit):
-    # Maintain length of list
-    values[variable] = values[variable][1:] + [data]
-    # Scale the values for the variable between 0 and 1
-    vmin = min(values[variable])
-    vmax = max(values[variable])
-    colours = [(v - vmin + 1) / (vmax - vmin + 1) for v in values[variable]]
+    # Add to the history, the oldest reading drops off
+    values[variable].append(data)
     # Format the variable name and value
     message = f"{variable[:4]}: {data:.1f} {unit}"
     logging.info(message)
-    draw.rectangle((0, 0, WIDTH, HEIGHT), (255, 255, 255))
-    for i in range(len(colours)):
-        # Convert the values to colours from red to blue
-        colour = (1.0 - colours[i]) * 0.6
-        r, g, b = [int(x * 255.0) for x in colorsys.hsv_to_rgb(colour, 1.0, 1.0)]
-        # Draw a 1-pixel wide rectangle of colour
-        draw.rectangle((i, top_pos, i + 1, HEIGHT), (r, g, b))
-        # Draw a line graph in black
-        line_y = HEIGHT - (top_pos + (colours[i] * (HEIGHT - top_pos))) + top_pos
-        draw.rectangle((i, line_y, i + 1, line_y + 1), (0, 0, 0))
+    # Render the graph, coloured from blue to red, as one frame
+    graph = Image.fromarray(chart.render(values[variable].values(), values[variable].min(), values[variable].max()))
     # Write the text at the top in black
-    draw.text((0, 0), message, font=font, fill=(0, 0, 0))
-    st7735.display(img)
-
-
-# Get the temperature of the CPU for compensation
-def get_cpu_temperature():
-    process = Popen(["vcgencmd", "measure_temp"], stdout=PIPE, universal_newlines=True)
-    output, _error = process.communicate()
-    return float(output[output.index("=") + 1 : output.rindex("'")])
+    ImageDraw.Draw(graph).text((0, 0), message, font=font, fill=(0, 0, 0))
+    st7735.display(graph)
 
 
 # Tuning factor for compensation. Decrease this number to adjust the
 # temperature down, and increase to adjust up
 factor = 2.25
 
-cpu_temps = [get_cpu_temperature()] * 5
+cpu_temps = History(5, initial=get_cpu_temperature())
 
 delay = 0.5  # Debounce the proximity tap
 mode = 0  # The starting mode
@@ -103,7 +90,7 @@ variables = ["temperature", "pressure", "humidity", "light"]
 values = {}
 
 for v in variables:
-    values[v] = [1] * WIDTH
+    values[v] = History(WIDTH, initial=1)
 
 # The main loop
 try:
@@ -122,8 +109,8 @@ try:
             unit = "°C"
             cpu_temp = get_cpu_temperature()
             # Smooth out with some averaging to decrease jitter
-            cpu_temps = cpu_temps[1:] + [cpu_temp]
-            avg_cpu_temp = sum(cpu_temps) / float(len(cpu_temps))
+            cpu_temps.append(cpu_temp)
+            avg_cpu_temp = cpu_temps.mean()
             raw_temp = bme280.get_temperature()
             data = raw_temp - ((avg_cpu_temp - raw_temp) / factor)
             display_text(variables[mode], data, unit)
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-import colorsys
 import sys
 import time
 
@@ -19,10 +18,12 @@ import logging
 from bme280 import BME280
 from fonts.ttf import RobotoMedium as UserFont
 from PIL import Image, ImageDraw, ImageFont
-from pms5003 import PMS5003
-from pms5003 import ReadTimeoutError as pmsReadTimeoutError
 
 from enviroplus import gas
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.display import StripChart
+from enviroplus.history import History
+from enviroplus.particulates import PMS5003Reader
 
 logging.basicConfig(format="%(asctime)s.%(msecs)03d %(levelname)-8s %(message)s", level=logging.INFO, datefmt="%Y-%m-%d %H:%M:%S")
 
@@ -35,8 +36,11 @@ Press Ctrl+C to exit!
 # BME280 temperature/pressure/humidity sensor
 bme280 = BME280()
 
-# PMS5003 particulate sensor
-pms5003 = PMS5003()
+# PMS5003 particulate sensor, read in the background
+pms5003 = PMS5003Reader()
+pms5003.start()
+# Frames arrive about once a second, one older than this means the sensor has stopped
+PMS5003_MAX_AGE = 10.0
 
 # Create ST7735 LCD display class
 st7735 = st7735.ST7735(port=0, cs=1, dc="GPIO9", backlight="GPIO12", rotation=270, spi_speed_hz=10000000)
@@ -59,45 +63,29 @@ message = ""
 top_pos = 25
 
 
+# Strip chart of the selected variable, below the text
+chart = StripChart(WIDTH, HEIGHT, top_pos)
+
+
 # Displays data and text on the 0.96" LCD
 def display_text(variable, data, unit):
-    # Maintain length of list
-    values[variable] = values[variable][1:] + [data]
-    # Scale the values for the variable between 0 and 1
-    vmin = min(values[variable])
-    vmax = max(values[variable])
-    colours = [(v - vmin + 1) / (vmax - vmin + 1) for v in values[variable]]
+    # Add to the history, the oldest reading drops off
+    values[variable].append(data)
     # Format the variable name and value
     message = f"{variable[:4]}: {data:.1f} {unit}"
     logging.info(message)
-    draw.rectangle((0, 0, WIDTH, HEIGHT), (255, 255, 255))
-    for i in range(len(colours)):
-        # Convert the values to colours from red to blue
-        colour = (1.0 - colours[i]) * 0.6
-        r, g, b = [int(x * 255.0) for x in colorsys.hsv_to_rgb(colour, 1.0, 1.0)]
-        # Draw a 1-pixel wide rectangle of colour
-        draw.rectangle((i, top_pos, i + 1, HEIGHT), (r, g, b))
-        # Draw a line graph in black
-        line_y = HEIGHT - (top_pos + (colours[i] * (HEIGHT - top_pos))) + top_pos
-        draw.rectangle((i, line_y, i + 1, line_y + 1), (0, 0, 0))
+    # Render the graph, coloured from blue to red, as one frame
+    graph = Image.fromarray(chart.render(values[variable].values(), values[variable].min(), values[variable].max()))
     # Write the text at the top in black
-    draw.text((0, 0), message, font=font, fill=(0, 0, 0))
-    st7735.display(img)
-
-
-# Get the temperature of the CPU for compensation
-def get_cpu_temperature():
-    with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-        temp = f.read()
-        temp = int(temp) / 1000.0
-    return temp
+    ImageDraw.Draw(graph).text((0, 0), message, font=font, fill=(0, 0, 0))
+    st7735.display(graph)
 
 
 # Tuning factor for compensation. Decrease this number to adjust the
 # temperature down, and increase to adjust up
 factor = 2.25
 
-cpu_temps = [get_cpu_temperature()] * 5
+cpu_temps = History(5, initial=get_cpu_temperature())
 
 delay = 0.5  # Debounce the proximity tap
 mode = 0  # The starting mode
@@ -110,7 +98,7 @@ variables = ["temperature", "pressure", "humidity", "light", "oxidised", "reduce
 values = {}
 
 for v in variables:
-    values[v] = [1] * WIDTH
+    values[v] = History(WIDTH, initial=1)
 
 # The main loop
 try:
@@ -129,8 +117,8 @@ try:
             unit = "°C"
             cpu_temp = get_cpu_temperature()
             # Smooth out with some averaging to decrease jitter
-            cpu_temps = cpu_temps[1:] + [cpu_temp]
-            avg_cpu_temp = sum(cpu_temps) / float(len(cpu_temps))
+            cpu_temps.append(cpu_temp)
+            avg_cpu_temp = cpu_temps.mean()
             raw_temp = bme280.get_temperature()
             data = raw_temp - ((avg_cpu_temp - raw_temp) / factor)
             display_text(variables[mode], data, unit)
@@ -159,31 +147,27 @@ try:
         if mode == 4:
             # variable = "oxidised"
             unit = "kO"
-            data = gas.read_all()
-            data = data.oxidising / 1000
+            data = gas.read_oxidising() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 5:
             # variable = "reduced"
             unit = "kO"
-            data = gas.read_all()
-            data = data.reducing / 1000
+            data = gas.read_reducing() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 6:
             # variable = "nh3"
             unit = "kO"
-            data = gas.read_all()
-            data = data.nh3 / 1000
+            data = gas.read_nh3() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 7:
             # variable = "pm1"
             unit = "ug/m3"
-            try:
-                data = pms5003.read()
-            except pmsReadTimeoutError:
-                logging.warning("Failed to read PMS5003")
+            data = pms5003.latest(max_age=PMS5003_MAX_AGE)
+            if data is None:
+                logging.warning("No PMS5003 frame in the last %.0fs", PMS5003_MAX_AGE)
             else:
                 data = float(data.pm_ug_per_m3(1.0))
                 display_text(variables[mode], data, unit)
@@ -191,10 +175,9 @@ try:
         if mode == 8:
             # variable = "pm25"
             unit = "ug/m3"
-            try:
-                data = pms5003.read()
-            except pmsReadTimeoutError:
-                logging.warning("Failed to read PMS5003")
+            data = pms5003.latest(max_age=PMS5003_MAX_AGE)
+            if data is None:
+                logging.warning("No PMS5003 frame in the last %.0fs", PMS5003_MAX_AGE)
             else:
                 data = float(data.pm_ug_per_m3(2.5))
                 display_text(variables[mode], data, unit)
@@ -202,10 +185,9 @@ try:
         if mode == 9:
             # variable = "pm10"
             unit = "ug/m3"
-            try:
-                data = pms5003.read()
-            except pmsReadTimeoutError:
-                logging.warning("Failed to read PMS5003")
+            data = pms5003.latest(max_age=PMS5003_MAX_AGE)
+            if data is None:
+                logging.warning("No PMS5003 frame in the last %.0fs", PMS5003_MAX_AGE)
             else:
                 data = float(data.pm_ug_per_m3(10))
                 display_text(variables[mode], data, unit)
@@ -6,6 +6,9 @@ import time
 from bme280 import BME280
 from smbus2 import SMBus
 
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.history import History
+
 logging.basicConfig(format="%(asctime)s.%(msecs)03d %(levelname)-8s %(message)s", level=logging.INFO, datefmt="%Y-%m-%d %H:%M:%S")
 
 logging.info("""compensated-temperature.py - Use the CPU temperature
@@ -21,25 +24,17 @@ bus = SMBus(1)
 bme280 = BME280(i2c_dev=bus)
 
 
-# Get the temperature of the CPU for compensation
-def get_cpu_temperature():
-    with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-        temp = f.read()
-        temp = int(temp) / 1000.0
-    return temp
-
-
 # Tuning factor for compensation. Decrease this number to adjust the
 # temperature down, and increase to adjust up
 factor = 2.25
 
-cpu_temps = [get_cpu_temperature()] * 5
+cpu_temps = History(5, initial=get_cpu_temperature())
 
 while True:
     cpu_temp = get_cpu_temperature()
     # Smooth out with some averaging to decrease jitter
-    cpu_temps = cpu_temps[1:] + [cpu_temp]
-    avg_cpu_temp = sum(cpu_temps) / float(len(cpu_temps))
+    cpu_temps.append(cpu_temp)
+    avg_cpu_temp = cpu_temps.mean()
     raw_temp = bme280.get_temperature()
     comp_temp = raw_temp - ((avg_cpu_temp - raw_temp) / factor)
     logging.info(f"Compensated temperature: {comp_temp:05.2f} °C")
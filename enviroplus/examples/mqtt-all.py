@@ -7,13 +7,16 @@ Example run: python3 mqtt-all.py --broker 192.168.1.164 --topic enviro --usernam
 
 import argparse
 import ssl
-import time
 
 import st7735
 from bme280 import BME280
-from pms5003 import PMS5003, ReadTimeoutError, SerialTimeoutError
+from pms5003 import PMS5003, SerialTimeoutError
 
 from enviroplus import gas
+from enviroplus.assets import get_font
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.particulates import PMS5003Reader
+from enviroplus.scheduler import Scheduler
 
 try:
     # Transitional fix for breaking change in LTR559
@@ -24,11 +27,10 @@ except ImportError:
     import ltr559
 
 import json
-from subprocess import PIPE, Popen, check_output
+from subprocess import check_output
 
 import paho.mqtt.client as mqtt
-from fonts.ttf import RobotoMedium as UserFont
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 try:
     from smbus2 import SMBus
@@ -43,6 +45,7 @@ DEFAULT_READ_INTERVAL = 5
 DEFAULT_TLS_MODE = False
 DEFAULT_USERNAME = None
 DEFAULT_PASSWORD = None
+PMS5003_MAX_AGE = 10.0
 
 
 # mqtt callbacks
@@ -76,30 +79,19 @@ def read_bme280(bme280):
     return values
 
 
-# Read values PMS5003 and return as dict
+# Read the latest PMS5003 frame and return as dict
 def read_pms5003(pms5003):
     values = {}
-    try:
-        pm_values = pms5003.read()  # int
-        values["pm1"] = pm_values.pm_ug_per_m3(1)
-        values["pm25"] = pm_values.pm_ug_per_m3(2.5)
-        values["pm10"] = pm_values.pm_ug_per_m3(10)
-    except ReadTimeoutError:
-        pms5003.reset()
-        pm_values = pms5003.read()
-        values["pm1"] = pm_values.pm_ug_per_m3(1)
-        values["pm25"] = pm_values.pm_ug_per_m3(2.5)
-        values["pm10"] = pm_values.pm_ug_per_m3(10)
+    # Frames arrive about once a second, an older one means the sensor has stopped
+    pm_values = pms5003.latest(max_age=PMS5003_MAX_AGE)
+    if pm_values is None:
+        raise RuntimeError(f"No PMS5003 frame in the last {PMS5003_MAX_AGE:.0f}s")
+    values["pm1"] = pm_values.pm_ug_per_m3(1)
+    values["pm25"] = pm_values.pm_ug_per_m3(2.5)
+    values["pm10"] = pm_values.pm_ug_per_m3(10)
     return values
 
 
-# Get CPU temperature to use for compensation
-def get_cpu_temperature():
-    process = Popen(["vcgencmd", "measure_temp"], stdout=PIPE, universal_newlines=True)
-    output, _error = process.communicate()
-    return float(output[output.index("=") + 1 : output.rindex("'")])
-
-
 # Get Raspberry Pi serial number to use as ID
 def get_serial_number():
     with open("/proc/cpuinfo", "r") as f:
@@ -123,7 +115,7 @@ def display_status(disp, mqtt_broker):
     HEIGHT = disp.height
     # Text settings
     font_size = 12
-    font = ImageFont.truetype(UserFont, font_size)
+    font = get_font(font_size)
 
     wifi_status = "connected" if check_wifi() else "disconnected"
     text_colour = (255, 255, 255)
@@ -216,8 +208,9 @@ def main():
     # Try to create PMS5003 instance
     HAS_PMS = False
     try:
-        pms5003 = PMS5003()
-        _ = pms5003.read()
+        pms5003 = PMS5003Reader(PMS5003())
+        _ = pms5003.pms5003.read()
+        pms5003.start()
         HAS_PMS = True
         print("PMS5003 sensor is connected")
     except SerialTimeoutError:
@@ -229,27 +222,40 @@ def main():
     print(f"Wi-Fi: {wifi_status}\n")
     print(f"MQTT broker IP: {args.broker}")
 
-    # Set an initial update time
-    update_time = time.time()
+    # Latest values from each read function, a failed read drops its values
+    # so nothing stale is published
+    readings = {}
 
-    # Main loop to read data, display, and send over mqtt
-    mqtt_client.loop_start()
-    while True:
+    def update(read, sensor):
+        try:
+            readings[read] = read(sensor)
+        except (RuntimeError, OSError) as e:
+            readings.pop(read, None)
+            print(e)
+
+    def publish():
+        values = {"serial": device_serial_number}
+        for reading in readings.values():
+            values.update(reading)
         try:
-            values = read_bme280(bme280)
-            if HAS_PMS:
-                pms_values = read_pms5003(pms5003)
-                values.update(pms_values)
-            time_since_update = time.time() - update_time
-            if time_since_update >= args.interval:
-                update_time = time.time()
-                values["serial"] = device_serial_number
-                print(values)
-                mqtt_client.publish(args.topic, json.dumps(values), retain=True)
-                display_status(disp, args.broker)
+            print(values)
+            mqtt_client.publish(args.topic, json.dumps(values), retain=True)
+            display_status(disp, args.broker)
         except Exception as e:
             print(e)
 
+    # Read each sensor at its own rate and publish every interval,
+    # sleeping in between rather than re-reading the sensors in a busy loop
+    scheduler = Scheduler()
+    scheduler.every(1.0, update, read_bme280, bme280)
+    if HAS_PMS:
+        # Frames are read in the background, pick up the latest about as often as they arrive
+        scheduler.every(1.0, update, read_pms5003, pms5003)
+    scheduler.every(args.interval, publish, delay=args.interval)
+
+    mqtt_client.loop_start()
+    scheduler.run()
+
 
 if __name__ == "__main__":
     main()
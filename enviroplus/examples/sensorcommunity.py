@@ -9,9 +9,11 @@ import st7735
 from bme280 import BME280
 from fonts.ttf import RobotoMedium as UserFont
 from PIL import Image, ImageDraw, ImageFont
-from pms5003 import PMS5003, ChecksumMismatchError, ReadTimeoutError
 from smbus2 import SMBus
 
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.particulates import PMS5003Reader
+
 logging.basicConfig(format="%(asctime)s.%(msecs)03d %(levelname)-8s %(message)s", level=logging.INFO, datefmt="%Y-%m-%d %H:%M:%S")
 
 logging.info("""sensorcommunity.py - Reads temperature, pressure, humidity,
@@ -39,8 +41,9 @@ disp = st7735.ST7735(port=0, cs=1, dc="GPIO9", backlight="GPIO12", rotation=270,
 # Initialize display
 disp.begin()
 
-# Create PMS5003 instance
-pms5003 = PMS5003()
+# Read PMS5003 frames in the background
+pms5003 = PMS5003Reader()
+pms5003.start()
 
 
 # Read values from BME280 and PMS5003 and return as dict
@@ -52,27 +55,15 @@ def read_values():
     values["temperature"] = f"{comp_temp:.2f}"
     values["pressure"] = f"{bme280.get_pressure() * 100:.2f}"
     values["humidity"] = f"{bme280.get_humidity():.2f}"
-    try:
-        pm_values = pms5003.read()
-        values["P2"] = str(pm_values.pm_ug_per_m3(2.5))
-        values["P1"] = str(pm_values.pm_ug_per_m3(10))
-    except (ReadTimeoutError, ChecksumMismatchError):
-        logging.info("Failed to read PMS5003. Resetting and retrying.")
-        pms5003.reset()
-        pm_values = pms5003.read()
-        values["P2"] = str(pm_values.pm_ug_per_m3(2.5))
-        values["P1"] = str(pm_values.pm_ug_per_m3(10))
+    # Average the PMS5003 frames since the last upload
+    pm25 = pms5003.mean(145, 2.5)
+    pm10 = pms5003.mean(145, 10)
+    if pm25 is not None:
+        values["P2"] = f"{pm25:.2f}"
+        values["P1"] = f"{pm10:.2f}"
     return values
 
 
-# Get the temperature of the CPU for compensation
-def get_cpu_temperature():
-    with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-        temp = f.read()
-        temp = int(temp) / 1000.0
-    return temp
-
-
 # Get Raspberry Pi serial number to use as ID
 def get_serial_number():
     with open("/proc/cpuinfo", "r") as f:
@@ -191,5 +182,7 @@ while True:
             else:
                 logging.warning("Sensor.Community Response: Failed")
         display_status()
+        # PMS5003 frames are read in the background, so pace the loop here
+        time.sleep(1.0)
     except Exception as e:
         logging.warning(f"Main Loop Exception: {e}")
@@ -1,7 +1,6 @@
-import colorsys
 import logging
 import time
-from subprocess import PIPE, Popen, check_output
+from subprocess import check_output
 
 import requests
 import st7735
@@ -12,6 +11,9 @@ from pms5003 import PMS5003, ReadTimeoutError
 from smbus2 import SMBus
 
 from enviroplus import gas
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.display import StripChart
+from enviroplus.history import History
 
 try:
     # Transitional fix for breaking change in LTR559
@@ -109,13 +111,6 @@ def read_values(comp_temp, mod_press, raw_humid, raw_pm25, raw_pm10):
     return values
 
 
-# Get CPU temperature to use for compensation
-def get_cpu_temperature():
-    process = Popen(["vcgencmd", "measure_temp"], stdout=PIPE, universal_newlines=True)
-    output, _error = process.communicate()
-    return float(output[output.index("=") + 1 : output.rindex("'")])
-
-
 # Get Raspberry Pi serial number to use as ID
 def get_serial_number():
     with open("/proc/cpuinfo", "r") as f:
@@ -160,37 +155,29 @@ top_pos = 25
 
 def save_data(idx, data):
     variable = variables[idx]
-    # Maintain length of list
-    values_lcd[variable] = values_lcd[variable][1:] + [data]
+    # Add to the history, the oldest reading drops off
+    values_lcd[variable].append(data)
     unit = units[idx]
     message = f"{variable[:4]}: {data:.1f} {unit}"
     logging.info(message)
 
 
+# Strip chart of the selected variable, below the text
+chart = StripChart(WIDTH, HEIGHT, top_pos)
+
+
 # Displays data and text on the 0.96" LCD
 def display_text(variable, data, unit):
-    # Maintain length of list
-    values_lcd[variable] = values_lcd[variable][1:] + [data]
-    # Scale the values for the variable between 0 and 1
-    vmin = min(values_lcd[variable])
-    vmax = max(values_lcd[variable])
-    colours = [(v - vmin + 1) / (vmax - vmin + 1) for v in values_lcd[variable]]
+    # Add to the history, the oldest reading drops off
+    values_lcd[variable].append(data)
     # Format the variable name and value
     message = f"{variable[:4]}: {data:.1f} {unit}"
     logging.info(message)
-    draw.rectangle((0, 0, WIDTH, HEIGHT), (255, 255, 255))
-    for i in range(len(colours)):
-        # Convert the values to colours from red to blue
-        colour = (1.0 - colours[i]) * 0.6
-        r, g, b = [int(x * 255.0) for x in colorsys.hsv_to_rgb(colour, 1.0, 1.0)]
-        # Draw a 1-pixel wide rectangle of colour
-        draw.rectangle((i, top_pos, i + 1, HEIGHT), (r, g, b))
-        # Draw a line graph in black
-        line_y = HEIGHT - (top_pos + (colours[i] * (HEIGHT - top_pos))) + top_pos
-        draw.rectangle((i, line_y, i + 1, line_y + 1), (0, 0, 0))
+    # Render the graph, coloured from blue to red, as one frame
+    graph = Image.fromarray(chart.render(values_lcd[variable].values(), values_lcd[variable].min(), values_lcd[variable].max()))
     # Write the text at the top in black
-    draw.text((0, 0), message, font=font, fill=(0, 0, 0))
-    st7735.display(img)
+    ImageDraw.Draw(graph).text((0, 0), message, font=font, fill=(0, 0, 0))
+    st7735.display(graph)
 
 
 # Displays all the text on the 0.96" LCD
@@ -202,7 +189,7 @@ def display_everything():
     row_count = len(variables) / column_count
     for i in range(len(variables)):
         variable = variables[i]
-        data_value = values_lcd[variable][-1]
+        data_value = values_lcd[variable].latest()
         unit = units[i]
         x = x_offset + ((WIDTH // column_count) * (i // row_count))
         y = y_offset + ((HEIGHT / row_count) * (i % row_count))
@@ -256,13 +243,13 @@ light = 1
 
 
 for v in variables:
-    values_lcd[v] = [1] * WIDTH
+    values_lcd[v] = History(WIDTH, initial=1)
 
 
 # Text settings
 font_size = 16
 font = ImageFont.truetype(UserFont, font_size)
-cpu_temps = [get_cpu_temperature()] * 5
+cpu_temps = History(5, initial=get_cpu_temperature())
 
 # Display Raspberry Pi serial and Wi-Fi status
 print(f"Raspberry Pi serial: {get_serial_number()}")
@@ -271,7 +258,6 @@ print(f"Wi-Fi: {wifi_status}\n")
 
 time_since_update = 0
 update_time = time.time()
-cpu_temps_len = float(len(cpu_temps))
 
 # Main loop to read data, display, and send to Sensor.Community
 while True:
@@ -282,8 +268,8 @@ while True:
         # Calculate these things once, not twice
         cpu_temp = get_cpu_temperature()
         # Smooth out with some averaging to decrease jitter
-        cpu_temps = cpu_temps[1:] + [cpu_temp]
-        avg_cpu_temp = sum(cpu_temps) / cpu_temps_len
+        cpu_temps.append(cpu_temp)
+        avg_cpu_temp = cpu_temps.mean()
         raw_temp = bme280.get_temperature()
         comp_temp = raw_temp - ((avg_cpu_temp - raw_temp) / comp_factor)
 
@@ -340,22 +326,19 @@ while True:
         if mode == 4:
             # variable = "oxidised"
             unit = "kO"
-            data = gas.read_all()
-            data = data.oxidising / 1000
+            data = gas.read_oxidising() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 5:
             # variable = "reduced"
             unit = "kO"
-            data = gas.read_all()
-            data = data.reducing / 1000
+            data = gas.read_reducing() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 6:
             # variable = "nh3"
             unit = "kO"
-            data = gas.read_all()
-            data = data.nh3 / 1000
+            data = gas.read_nh3() / 1000
             display_text(variables[mode], data, unit)
 
         if mode == 7:
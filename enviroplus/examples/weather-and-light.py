@@ -2,21 +2,19 @@
 # -*- coding: utf-8 -*-
 
 import colorsys
-import os
 import time
-from datetime import datetime, timedelta
 
-import numpy
-import pytz
 import st7735
-from astral.geocoder import database, lookup
-from astral.sun import sun
 from bme280 import BME280
-from fonts.ttf import RobotoMedium as UserFont
 from ltr559 import LTR559
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from PIL import Image, ImageDraw, ImageFilter
 from smbus2 import SMBus
 
+from enviroplus.assets import Assets
+from enviroplus.cpu import get_cpu_temperature
+from enviroplus.history import History, Trend
+from enviroplus.solar import sun_period
+
 
 def calculate_y_pos(x, centre):
     """Calculates the y-coordinate on a parabolic curve, given x."""
@@ -77,53 +75,10 @@ def x_from_sun_moon_time(progress, period, x_range):
 
 def sun_moon_time(city_name, time_zone):
     """Calculate the progress through the current sun/moon period (i.e day or
-    night) from the last sunrise or sunset, given a datetime object "t"."""
-
-    city = lookup(city_name, database())
-
-    # Datetime objects for yesterday, today, tomorrow
-    utc = pytz.utc
-    utc_dt = datetime.now(tz=utc)
-    local_dt = utc_dt.astimezone(pytz.timezone(time_zone))
-    today = local_dt.date()
-    yesterday = today - timedelta(1)
-    tomorrow = today + timedelta(1)
-
-    # Sun objects for yesterday, today, tomorrow
-    sun_yesterday = sun(city.observer, date=yesterday)
-    sun_today = sun(city.observer, date=today)
-    sun_tomorrow = sun(city.observer, date=tomorrow)
-
-    # Work out sunset yesterday, sunrise/sunset today, and sunrise tomorrow
-    sunset_yesterday = sun_yesterday["sunset"]
-    sunrise_today = sun_today["sunrise"]
-    sunset_today = sun_today["sunset"]
-    sunrise_tomorrow = sun_tomorrow["sunrise"]
-
-    # Work out lengths of day or night period and progress through period
-    if sunrise_today < local_dt < sunset_today:
-        day = True
-        period = sunset_today - sunrise_today
-        # mid = sunrise_today + (period / 2)
-        progress = local_dt - sunrise_today
-
-    elif local_dt > sunset_today:
-        day = False
-        period = sunrise_tomorrow - sunset_today
-        # mid = sunset_today + (period / 2)
-        progress = local_dt - sunset_today
-
-    else:
-        day = False
-        period = sunrise_today - sunset_yesterday
-        # mid = sunset_yesterday + (period / 2)
-        progress = local_dt - sunset_yesterday
+    night) from the last sunrise or sunset. The city is looked up once and the
+    sunrise and sunset times are only recalculated when the date changes."""
 
-    # Convert time deltas to seconds
-    progress = progress.total_seconds()
-    period = period.total_seconds()
-
-    return (progress, period, day, local_dt)
+    return sun_period(city_name, time_zone)
 
 
 def draw_background(progress, period, day):
@@ -190,13 +145,6 @@ def overlay_text(img, position, text, font, align_right=False, rectangle=False):
     return img
 
 
-def get_cpu_temperature():
-    with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-        temp = f.read()
-        temp = int(temp) / 1000.0
-    return temp
-
-
 def correct_humidity(humidity, temperature, corr_temperature):
     dewpoint = temperature - ((100 - humidity) / 5)
     corr_humidity = 100 - (5 * (corr_temperature - dewpoint))
@@ -204,29 +152,16 @@ def correct_humidity(humidity, temperature, corr_temperature):
 
 
 def analyse_pressure(pressure, t):
-    global time_vals, pressure_vals, trend
-    if len(pressure_vals) > num_vals:
-        pressure_vals = pressure_vals[1:] + [pressure]
-        time_vals = time_vals[1:] + [t]
-
-        # Calculate line of best fit
-        line = numpy.polyfit(time_vals, pressure_vals, 1, full=True)
-
-        # Calculate slope, variance, and confidence
-        slope = line[0][0]
-        intercept = line[0][1]
-        variance = numpy.var(pressure_vals)
-        residuals = numpy.var([(slope * x + intercept - y) for x, y in zip(time_vals, pressure_vals)])
-        r_squared = 1 - residuals / variance
-
-        # Calculate change in pressure per hour
-        change_per_hour = slope * 60 * 60
-        # variance_per_hour = variance * 60 * 60
-
-        mean_pressure = numpy.mean(pressure_vals)
+    global trend
+    pressure_trend.append(t, pressure)
+    mean_pressure = pressure_trend.mean()
+    if pressure_trend.full:
+        # Line of best fit, updated from running sums
+        r_squared = pressure_trend.r_squared()
+        change_per_hour = pressure_trend.change_per_hour()
 
         # Calculate trend
-        if r_squared > 0.5:
+        if r_squared is not None and r_squared > 0.5:
             if change_per_hour > 0.5:
                 trend = ">"
             elif change_per_hour < -0.5:
@@ -238,9 +173,6 @@ def analyse_pressure(pressure, t):
                 if abs(change_per_hour) > 3:
                     trend *= 2
     else:
-        pressure_vals.append(pressure)
-        time_vals.append(t)
-        mean_pressure = numpy.mean(pressure_vals)
         change_per_hour = 0
         trend = "-"
 
@@ -308,9 +240,11 @@ day_hue = 25
 
 sun_radius = 50
 
-# Fonts
-font_sm = ImageFont.truetype(UserFont, 12)
-font_lg = ImageFont.truetype(UserFont, 14)
+# Fonts and icons, loaded once so drawing a frame does no file I/O
+assets = Assets()
+assets.load_icons()
+font_sm = assets.font(12)
+font_lg = assets.font(14)
 
 # Margins
 margin = 3
@@ -324,15 +258,14 @@ min_temp = None
 max_temp = None
 
 factor = 2.25
-cpu_temps = [get_cpu_temperature()] * 5
+cpu_temps = History(5, initial=get_cpu_temperature())
 
 # Set up light sensor
 ltr559 = LTR559()
 
 # Pressure variables
-pressure_vals = []
-time_vals = []
 num_vals = 1000
+pressure_trend = Trend(num_vals)
 interval = 1
 trend = "-"
 
@@ -340,7 +273,6 @@ trend = "-"
 start_time = time.time()
 
 while True:
-    path = os.path.dirname(os.path.realpath(__file__))
     progress, period, day, local_dt = sun_moon_time(city_name, time_zone)
     background = draw_background(progress, period, day)
 
@@ -356,8 +288,8 @@ while True:
 
     # Corrected temperature
     cpu_temp = get_cpu_temperature()
-    cpu_temps = cpu_temps[1:] + [cpu_temp]
-    avg_cpu_temp = sum(cpu_temps) / float(len(cpu_temps))
+    cpu_temps.append(cpu_temp)
+    avg_cpu_temp = cpu_temps.mean()
     corr_temperature = temperature - ((avg_cpu_temp - temperature) / factor)
 
     if time_elapsed > 30:
@@ -379,7 +311,7 @@ while True:
     else:
         range_string = "------"
     img = overlay_text(img, (68, 18 + spacing), range_string, font_sm, align_right=True, rectangle=True)
-    temp_icon = Image.open(f"{path}/icons/temperature.png")
+    temp_icon = assets.icon("temperature")
     img.paste(temp_icon, (margin, 18), mask=temp_icon)
 
     # Humidity
@@ -391,7 +323,7 @@ while True:
     spacing = text_height + 1
     humidity_desc = describe_humidity(corr_humidity).upper()
     img = overlay_text(img, (68, 48 + spacing), humidity_desc, font_sm, align_right=True, rectangle=True)
-    humidity_icon = Image.open(f"{path}/icons/humidity-{humidity_desc.lower()}.png")
+    humidity_icon = assets.icon(f"humidity-{humidity_desc.lower()}")
     img.paste(humidity_icon, (margin, 48), mask=humidity_icon)
 
     # Light
@@ -402,8 +334,8 @@ while True:
     spacing = text_height + 1
     light_desc = describe_light(light).upper()
     img = overlay_text(img, (WIDTH - margin - 1, 18 + spacing), light_desc, font_sm, align_right=True, rectangle=True)
-    light_icon = Image.open(f"{path}/icons/bulb-{light_desc.lower()}.png")
-    img.paste(humidity_icon, (80, 18), mask=light_icon)
+    light_icon = assets.icon(f"bulb-{light_desc.lower()}")
+    img.paste(light_icon, (80, 18), mask=light_icon)
 
     # Pressure
     pressure = bme280.get_pressure()
@@ -415,7 +347,7 @@ while True:
     _, text_height = text_size(font_lg, pressure_string.replace(",", ""))
     spacing = text_height + 1
     img = overlay_text(img, (WIDTH - margin - 1, 48 + spacing), pressure_desc, font_sm, align_right=True, rectangle=True)
-    pressure_icon = Image.open(f"{path}/icons/weather-{pressure_desc.lower()}.png")
+    pressure_icon = assets.icon(f"weather-{pressure_desc.lower()}")
     img.paste(pressure_icon, (80, 48), mask=pressure_icon)
 
     # Display image
@@ -91,7 +91,7 @@ EXAMPLE_INFO = {
     "weather-and-light.py": {
         "description": "Weather display with day/night icons based on light levels",
         "hardware": ["BME280", "LTR559", "ST7735 LCD"],
-        "dependencies": ["pillow", "fonts", "astral", "pytz"],
+        "dependencies": ["pillow", "fonts", "astral", "tzdata"],
     },
     "combined.py": {"description": "Combined sensor readings with LCD display", "hardware": ["Multiple sensors", "ST7735 LCD"], "dependencies": ["pillow", "fonts"]},
     "mqtt-all.py": {"description": "Publish all sensor data to MQTT broker", "hardware": ["All Enviro+ sensors"], "dependencies": ["paho-mqtt"]},
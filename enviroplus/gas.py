@@ -1,6 +1,7 @@
 """Read the MICS6814 via an ads1015 ADC"""
 
 import atexit
+import threading
 import time
 
 import ads1015
@@ -8,8 +9,15 @@ import gpiod
 import gpiodevice
 from gpiod.line import Direction, Value
 
+from .background import BackgroundReader
+
 MICS6814_GAIN = 6.144
 
+CHANNELS = ("oxidising", "reducing", "nh3", "adc")
+
+_MUX = {"oxidising": "in0/gnd", "reducing": "in1/gnd", "nh3": "in2/gnd"}
+_ALIASES = {"ox": "oxidising", "red": "reducing"}
+
 OUTH = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=Value.ACTIVE)
 
 
@@ -18,22 +26,33 @@ _is_setup = False
 _is_available = False
 _adc_enabled = False
 _adc_gain = 6.148
+_adc_max_age = None
+_adc_value = None
+_adc_timestamp = None
 _heater = None
+_stream = None
+_lock = threading.Lock()
 
 
 class Mics6814Reading(object):
-    __slots__ = "oxidising", "reducing", "nh3", "adc"
+    __slots__ = "oxidising", "reducing", "nh3", "adc", "timestamp"
 
-    def __init__(self, ox, red, nh3, adc=None):
+    def __init__(self, ox, red, nh3, adc=None, timestamp=None):
         self.oxidising = ox
         self.reducing = red
         self.nh3 = nh3
         self.adc = adc
+        self.timestamp = timestamp
 
     def __repr__(self):
-        fmt = f"""Oxidising: {self.oxidising:05.02f} Ohms
-Reducing: {self.reducing:05.02f} Ohms
-NH3: {self.nh3:05.02f} Ohms"""
+        lines = []
+        if self.oxidising is not None:
+            lines.append(f"Oxidising: {self.oxidising:05.02f} Ohms")
+        if self.reducing is not None:
+            lines.append(f"Reducing: {self.reducing:05.02f} Ohms")
+        if self.nh3 is not None:
+            lines.append(f"NH3: {self.nh3:05.02f} Ohms")
+        fmt = "\n".join(lines)
         if self.adc is not None:
             fmt += f"""
 ADC: {self.adc:05.02f} Volts
@@ -44,7 +63,7 @@ ADC: {self.adc:05.02f} Volts
 
 
 def setup():
-    global adc, adc_type, _is_setup, _is_available, _heater
+    global adc, adc_type, _conversion_time, _is_setup, _is_available, _heater
     if _is_setup:
         return
     _is_setup = True
@@ -61,8 +80,10 @@ def setup():
     adc.set_programmable_gain(MICS6814_GAIN)
     if adc_type == "ADS1115":
         adc.set_sample_rate(128)
+        _conversion_time = 1.2 / 128
     else:
         adc.set_sample_rate(1600)
+        _conversion_time = 1.2 / 1600
 
     _heater = gpiodevice.get_pin("GPIO24", "EnviroPlus", OUTH)
 
@@ -76,61 +97,179 @@ def available():
 
 def enable_adc(value=True):
     """Enable reading from the additional ADC pin."""
-    global _adc_enabled
+    global _adc_enabled, _adc_timestamp
     _adc_enabled = value
+    _adc_timestamp = None
 
 
 def set_adc_gain(value):
     """Set gain value for the additional ADC pin."""
-    global _adc_gain
+    global _adc_gain, _adc_timestamp
     _adc_gain = value
+    _adc_timestamp = None
 
 
-def cleanup():
-    if _heater is None:
-        return
-    lines, offset = _heater
-    lines.set_value(offset, Value.INACTIVE)
+def set_adc_max_age(value):
+    """Set how long, in seconds, a spare ADC reading may be reused.
 
+    Reading the spare ADC pin at a gain other than MICS6814_GAIN means
+    reprogramming the ADC and waiting 50ms for it to settle. With a max age
+    set, gas reads reuse the cached value until it is older than this, so the
+    gain switch happens at most once per period.
 
-def read_all():
-    """Return gas resistance for oxidising, reducing and NH3"""
+    A running stream refreshes the value itself, between readings, so the
+    readings it returns never wait on it. Without a stream, the single-shot
+    read that finds the value stale pays for the refresh. To keep that out of
+    gas reads, use float("inf") and call refresh_adc() from a timer at its own
+    period, as enviroplus-hub does.
+
+    :param value: Max age in seconds, None (default) to sample on every read or float("inf") to only sample on first use and refresh_adc()
+
+    """
+    global _adc_max_age
+    _adc_max_age = value
+
+
+def refresh_adc():
+    """Sample the spare ADC pin now, update the cache and return the value."""
     setup()
 
     if not _is_available:
         raise RuntimeError("Gas sensor not connected.")
 
-    ox = adc.get_voltage("in0/gnd")
-    red = adc.get_voltage("in1/gnd")
-    nh3 = adc.get_voltage("in2/gnd")
+    get_voltage = _get_voltage
+    if _stream is not None and _stream.running:
+        get_voltage = _get_continuous_voltage
 
-    try:
-        ox = (ox * 56000) / (3.3 - ox)
-    except ZeroDivisionError:
-        ox = 0
+    with _lock:
+        return _read_analog(get_voltage)
 
-    try:
-        red = (red * 56000) / (3.3 - red)
-    except ZeroDivisionError:
-        red = 0
 
+def cleanup():
+    stop_stream()
+    if _heater is None:
+        return
+    lines, offset = _heater
+    lines.set_value(offset, Value.INACTIVE)
+
+
+def _resistance(voltage):
     try:
-        nh3 = (nh3 * 56000) / (3.3 - nh3)
+        return (voltage * 56000) / (3.3 - voltage)
     except ZeroDivisionError:
-        nh3 = 0
+        return 0
+
+
+def _get_voltage(channel, gain=MICS6814_GAIN):
+    # The single-shot path reads the gain back from the ADC
+    return adc.get_voltage(channel)
+
+
+def _get_continuous_voltage(channel, gain=MICS6814_GAIN):
+    """Read channel while the ADC is free-running in continuous mode.
+
+    Changing the multiplexer, or the gain, does not restart a conversion:
+    the one in progress finishes with the old settings and only the next
+    uses the new ones. Wait out both before picking up the result register.
+
+    """
+    adc.set_multiplexer(channel)
+    time.sleep(2 * _conversion_time)
+    value = adc.get_conversion_value()
+    if adc_type == "ADS1115":
+        value /= 32768.0
+    else:
+        value /= 2048.0
+    return value * gain
+
+
+def _read_analog(get_voltage):
+    global _adc_value, _adc_timestamp
+
+    if _adc_gain == MICS6814_GAIN:
+        value = get_voltage("ref/gnd")
+    else:
+        adc.set_programmable_gain(_adc_gain)
+        time.sleep(0.05)
+        value = get_voltage("ref/gnd", _adc_gain)
+        adc.set_programmable_gain(MICS6814_GAIN)
+
+    _adc_value = value
+    _adc_timestamp = time.monotonic()
+    return value
+
+
+def _adc_stale():
+    return _adc_max_age is None or _adc_timestamp is None or time.monotonic() - _adc_timestamp > _adc_max_age
 
-    analog = None
 
-    if _adc_enabled:
-        if _adc_gain == MICS6814_GAIN:
-            analog = adc.get_voltage("ref/gnd")
+def _read(get_voltage, channels=CHANNELS, refresh_adc=True):
+    values = dict.fromkeys(CHANNELS)
+
+    for channel in channels:
+        if channel == "adc":
+            continue
+        values[channel] = _resistance(get_voltage(_MUX[channel]))
+
+    if _adc_enabled and "adc" in channels:
+        if refresh_adc and _adc_stale():
+            values["adc"] = _read_analog(get_voltage)
         else:
-            adc.set_programmable_gain(_adc_gain)
-            time.sleep(0.05)
-            analog = adc.get_voltage("ref/gnd")
-            adc.set_programmable_gain(MICS6814_GAIN)
+            values["adc"] = _adc_value
+
+    return Mics6814Reading(values["oxidising"], values["reducing"], values["nh3"], values["adc"], time.time())
+
+
+def _channel_names(channels):
+    names = []
+    for channel in channels:
+        name = _ALIASES.get(channel, channel)
+        if name not in CHANNELS:
+            raise ValueError(f"Unknown channel {channel!r}, expected one of {', '.join(CHANNELS)}")
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def read_all():
+    """Return gas resistance for oxidising, reducing and NH3
+
+    While a stream is running this returns its latest reading instead of
+    touching the ADC.
+
+    """
+    return read_channels(CHANNELS)
+
+
+def read_channels(channels):
+    """Return gas resistance for a subset of channels.
+
+    Only the requested channels are converted, fields for any others are None.
+
+    While a stream is running this returns its latest reading instead of
+    touching the ADC.
+
+    :param channels: Iterable of channel names: "oxidising" (or "ox"), "reducing" (or "red"), "nh3" and "adc"
+
+    """
+    channels = _channel_names(channels)
+
+    setup()
 
-    return Mics6814Reading(ox, red, nh3, analog)
+    if not _is_available:
+        raise RuntimeError("Gas sensor not connected.")
+
+    if _stream is not None and _stream.running:
+        # Only wait a few sample periods, the stream's reads may be failing
+        reading = _stream.latest(wait=True, timeout=_stream.max_age, max_age=_stream.max_age)
+        if reading is not None:
+            return reading
+        # No live readings, read the bus directly so any error reaches the caller
+        with _lock:
+            return _read(_get_continuous_voltage, channels)
+
+    with _lock:
+        return _read(_get_voltage, channels)
 
 
 def read_oxidising():
@@ -138,7 +277,7 @@ def read_oxidising():
 
     Eg chlorine, nitrous oxide
     """
-    return read_all().oxidising
+    return read_channels(("oxidising",)).oxidising
 
 
 def read_reducing():
@@ -146,14 +285,124 @@ def read_reducing():
 
     Eg hydrogen, carbon monoxide
     """
-    return read_all().reducing
+    return read_channels(("reducing",)).reducing
 
 
 def read_nh3():
     """Return gas resistance for nh3/ammonia"""
-    return read_all().nh3
+    return read_channels(("nh3",)).nh3
 
 
 def read_adc():
     """Return spare ADC channel value"""
-    return read_all().adc
+    return read_channels(("adc",)).adc
+
+
+class Mics6814Stream(BackgroundReader):
+    """Continuous MICS6814 sampling on a background thread.
+
+    Readings are kept in a bounded ring buffer, the oldest are discarded
+    once it is full. Iterating over a stream blocks until new readings
+    arrive and yields them in order until the stream is stopped.
+
+    A bus error is logged and counted in errors and sampling carries on.
+    Readings older than max_age seconds, a few sample periods, are not
+    considered live.
+
+    """
+
+    def __init__(self, rate_hz=10.0, size=64):
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be greater than zero")
+        BackgroundReader.__init__(self, size, "mics6814-stream")
+        self.rate_hz = rate_hz
+        self.max_age = max(1.0, 4.0 / rate_hz)
+
+    def start(self):
+        """Switch the ADC to continuous mode and start sampling."""
+        if self._running:
+            return
+        adc.set_mode("continuous")
+        BackgroundReader.start(self)
+
+    def stop(self):
+        """Stop sampling and return the ADC to single-shot mode."""
+        if self._thread is None:
+            return
+        BackgroundReader.stop(self)
+        adc.set_mode("single")
+
+    def readings(self):
+        """Return a list of all buffered readings, oldest first."""
+        with self._condition:
+            return [reading for _, reading in self._items]
+
+    def __iter__(self):
+        seen = self._count
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda seen=seen: self._count > seen or not self._running)
+                if self._count == seen:
+                    return
+                new = min(self._count - seen, len(self._items))
+                readings = [reading for _, reading in list(self._items)[-new:]]
+                seen = self._count
+            yield from readings
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        next_time = time.monotonic()
+        while self._running:
+            try:
+                with _lock:
+                    if _adc_enabled and _adc_max_age is not None and _adc_stale():
+                        # Refresh the spare pin at its own rate, ahead of a reading rather than inside one
+                        _read_analog(_get_continuous_voltage)
+                    reading = _read(_get_continuous_voltage, refresh_adc=_adc_max_age is None)
+            except OSError as e:
+                self._error("Failed to read MICS6814: %s", e)
+            else:
+                self._publish(reading)
+
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                next_time = time.monotonic()
+                continue
+            self._wait(delay)
+
+
+def stream(rate_hz=10.0, size=64):
+    """Start sampling the MICS6814 continuously in the background.
+
+    The ADC is switched to continuous mode and a background thread cycles
+    the multiplexer across in0/in1/in2, storing timestamped readings in a
+    ring buffer of size entries. While the stream runs read_all() returns
+    the latest reading without waiting on the bus.
+
+    Each channel waits two conversion periods after the multiplexer is
+    switched, so one reading takes about 5ms on an ADS1015 and 60ms on an
+    ADS1115, which bounds the achievable rate_hz.
+
+    :param rate_hz: Number of full readings to take per second
+    :param size: Number of readings to keep in the ring buffer
+
+    """
+    global _stream
+    setup()
+
+    if not _is_available:
+        raise RuntimeError("Gas sensor not connected.")
+
+    stop_stream()
+    _stream = Mics6814Stream(rate_hz, size)
+    _stream.start()
+    return _stream
+
+
+def stop_stream():
+    """Stop the background stream, if one is running."""
+    global _stream
+    if _stream is not None:
+        _stream.stop()
+        _stream = None
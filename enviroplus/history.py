@@ -0,0 +1,234 @@
+"""Fixed-size histories of sensor readings.
+
+History keeps the last size readings in a preallocated NumPy ring buffer.
+Appending is O(1), with no list copy, and the rolling min, max and mean are
+O(1) too: the sum is kept as readings come and go and the min and max come
+from monotonic queues of candidates.
+
+    temperatures = History(160, initial=20.0)
+    temperatures.append(21.5)
+    temperatures.mean(), temperatures.min(), temperatures.max()
+    chart.render(temperatures.values())
+
+Trend fits a least-squares line to the last size (x, y) pairs from running
+sums, so the slope and R² are O(1) per sample instead of a polyfit over the
+whole window.
+
+    pressure = Trend(1000)
+    pressure.append(time.time(), bme280.get_pressure())
+    pressure.change_per_hour(), pressure.r_squared()
+
+"""
+
+import collections
+
+import numpy
+
+
+class History:
+    def __init__(self, size, initial=None):
+        """Keep the last size readings.
+
+        :param size: Number of readings to keep
+        :param initial: Value to fill the history with, None to start empty
+
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.size = size
+        self._data = numpy.zeros(size, dtype=numpy.float64)
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        # (sequence number, value) pairs, values ascending in _mins and descending in _maxs
+        self._mins = collections.deque()
+        self._maxs = collections.deque()
+
+        if initial is not None:
+            for _ in range(size):
+                self.append(initial)
+
+    def append(self, value):
+        """Add a reading, dropping the oldest once the history is full."""
+        value = float(value)
+        sequence = self._count
+
+        if sequence >= self.size:
+            self._sum -= self._data[self._next]
+        self._data[self._next] = value
+        self._sum += value
+        self._next = (self._next + 1) % self.size
+        self._count += 1
+
+        expired = self._count - self.size
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((sequence, value))
+        if self._mins[0][0] < expired:
+            self._mins.popleft()
+
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((sequence, value))
+        if self._maxs[0][0] < expired:
+            self._maxs.popleft()
+
+        if self._next == 0:
+            # Once per lap, resum so rounding errors in the running sum can't build up
+            self._sum = float(self._data.sum())
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    @property
+    def full(self):
+        return self._count >= self.size
+
+    def latest(self):
+        """Return the most recent reading, or None if there are none."""
+        if self._count == 0:
+            return None
+        return float(self._data[self._next - 1])
+
+    def values(self):
+        """Return the readings as a new NumPy array, oldest first."""
+        if self._count < self.size:
+            return self._data[: self._count].copy()
+        return numpy.concatenate((self._data[self._next :], self._data[: self._next]))
+
+    def mean(self):
+        """Return the mean of the readings, or None if there are none."""
+        if self._count == 0:
+            return None
+        return self._sum / len(self)
+
+    def min(self):
+        """Return the smallest reading, or None if there are none."""
+        if self._count == 0:
+            return None
+        return self._mins[0][1]
+
+    def max(self):
+        """Return the largest reading, or None if there are none."""
+        if self._count == 0:
+            return None
+        return self._maxs[0][1]
+
+
+class Trend:
+    def __init__(self, size):
+        """Fit a line to the last size (x, y) pairs.
+
+        Keeps Σx, Σy, Σx², Σxy and Σy² as pairs come and go. Values are
+        stored relative to an origin, moved to the oldest pair once per lap
+        when the sums are recomputed, so large x values such as Unix times
+        don't lose precision in Σx².
+
+        :param size: Number of pairs to fit
+
+        """
+        if size < 2:
+            raise ValueError("size must be at least 2")
+
+        self.size = size
+        self._x = numpy.zeros(size, dtype=numpy.float64)
+        self._y = numpy.zeros(size, dtype=numpy.float64)
+        self._next = 0
+        self._count = 0
+        self._origin = (0.0, 0.0)
+        self._sums = [0.0] * 5  # Σx, Σy, Σx², Σxy, Σy²
+
+    def append(self, x, y):
+        """Add a pair, dropping the oldest once the window is full.
+
+        :param x: Sample time, eg: time.time()
+        :param y: Reading
+
+        """
+        if self._count == 0:
+            self._origin = (float(x), float(y))
+        x = float(x) - self._origin[0]
+        y = float(y) - self._origin[1]
+        sums = self._sums
+
+        if self._count >= self.size:
+            old_x = self._x[self._next]
+            old_y = self._y[self._next]
+            sums[0] -= old_x
+            sums[1] -= old_y
+            sums[2] -= old_x * old_x
+            sums[3] -= old_x * old_y
+            sums[4] -= old_y * old_y
+
+        self._x[self._next] = x
+        self._y[self._next] = y
+        sums[0] += x
+        sums[1] += y
+        sums[2] += x * x
+        sums[3] += x * y
+        sums[4] += y * y
+        self._next = (self._next + 1) % self.size
+        self._count += 1
+
+        if self._next == 0:
+            self._rebase()
+
+    def _rebase(self):
+        # Once per lap, move the origin to the oldest pair and resum, so rounding errors can't build up
+        # The window is full and wraps here, so the oldest pair is at index 0
+        shift_x = self._x[0]
+        shift_y = self._y[0]
+        self._x -= shift_x
+        self._y -= shift_y
+        self._origin = (self._origin[0] + shift_x, self._origin[1] + shift_y)
+        x, y = self._x, self._y
+        self._sums = [float(x.sum()), float(y.sum()), float(x.dot(x)), float(x.dot(y)), float(y.dot(y))]
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    @property
+    def full(self):
+        return self._count >= self.size
+
+    def _moments(self):
+        # n, Sxx, Sxy and Syy, the centred sums of squares and products
+        n = len(self)
+        sx, sy, sxx, sxy, syy = self._sums
+        return n, sxx - sx * sx / n, sxy - sx * sy / n, syy - sy * sy / n
+
+    def mean(self):
+        """Return the mean of the y values, or None if there are none."""
+        if self._count == 0:
+            return None
+        return self._sums[1] / len(self) + self._origin[1]
+
+    def slope(self):
+        """Return the slope of the line of best fit, or None with fewer than two distinct x values."""
+        if self._count < 2:
+            return None
+        _, sxx, sxy, _ = self._moments()
+        if sxx <= 0:
+            return None
+        return sxy / sxx
+
+    def change_per_hour(self):
+        """Return the slope per hour, for x in seconds, or None if there is no slope."""
+        slope = self.slope()
+        if slope is None:
+            return None
+        return slope * 60 * 60
+
+    def r_squared(self):
+        """Return the coefficient of determination of the fit.
+
+        Returns 0.0 if all the y values are equal, None if there is no fit.
+
+        """
+        if self.slope() is None:
+            return None
+        _, sxx, sxy, syy = self._moments()
+        if syy <= 0:
+            return 0.0
+        return min(1.0, sxy * sxy / (sxx * syy))
@@ -0,0 +1,358 @@
+"""Sensor hub: one process owns the hardware and shares readings.
+
+The hub polls each sensor at its own rate and keeps the latest reading of
+each. Clients get them over a Unix socket, or from a JSON snapshot file that
+is replaced atomically on every update (put it on /dev/shm to keep it in
+memory). Any number of displays, loggers and uploaders can then run at once
+without opening the bus or serial port themselves.
+
+Socket protocol: send one line, "get" for the current snapshot or "watch"
+for a new snapshot after every update. Each snapshot is one line of JSON:
+
+    {"time": 1700000000.0, "sensors": {"bme280": {"time": ..., "temperature": 21.5, ...}, ...}}
+
+Usage:
+    enviroplus-hub                                  # Serve on /tmp/enviroplus-hub.sock
+    enviroplus-hub --snapshot /dev/shm/enviroplus.json --gas 0.5 --noise 0.5
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from .scheduler import Scheduler
+
+SOCKET_PATH = "/tmp/enviroplus-hub.sock"
+
+logger = logging.getLogger(__name__)
+
+
+class Hub:
+    def __init__(self, socket_path=SOCKET_PATH, snapshot_path=None):
+        """Poll sensors and publish their latest readings.
+
+        :param socket_path: Unix socket to serve on, or None for no socket
+        :param snapshot_path: JSON file to replace on every update, or None for no file
+
+        """
+        self.socket_path = socket_path
+        self.snapshot_path = snapshot_path
+        self._sensors = {}
+        self._scheduler = Scheduler()
+        self._readings = {}
+        self._version = 0
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._server = None
+
+    def add_sensor(self, name, period, read):
+        """Poll a sensor every period seconds.
+
+        :param name: Key for the sensor's readings in the snapshot
+        :param period: Seconds between reads
+        :param read: Callable returning a dict of values
+
+        """
+        self._scheduler.every(period, self.update, name)
+        self._sensors[name] = read
+
+    def every(self, period, func, *args):
+        """Run a housekeeping task, eg: a calibration refresh, every period seconds on the polling thread.
+
+        A failure is logged and the task stays scheduled.
+
+        :param period: Seconds between calls
+        :param func: Callable to run
+
+        """
+        self._scheduler.every(period, self._call, func, args)
+
+    def _call(self, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            # Tasks call into any sensor library, so catch everything and keep the traceback for debugging
+            logger.warning("%s failed: %s", getattr(func, "__name__", func), e, exc_info=logger.isEnabledFor(logging.DEBUG))
+
+    @property
+    def sensors(self):
+        """Names of the sensors being polled."""
+        return tuple(self._sensors)
+
+    def snapshot(self):
+        """Return the latest readings of every sensor."""
+        with self._condition:
+            return {"time": time.time(), "sensors": dict(self._readings)}
+
+    def update(self, name):
+        """Read one sensor now and publish the result.
+
+        A failed read is logged and the previous reading is kept.
+
+        """
+        try:
+            values = dict(self._sensors[name]())
+        except Exception as e:
+            # Sensor libraries raise all sorts, a bad read must not stop the polling thread
+            logger.warning("Reading %s failed: %s", name, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return
+
+        values["time"] = time.time()
+        with self._condition:
+            self._readings[name] = values
+            self._version += 1
+            self._condition.notify_all()
+
+        if self.snapshot_path is not None:
+            self._write_snapshot()
+
+    def wait(self, version, timeout=None):
+        """Wait for an update after version.
+
+        :return: Tuple of the new version and snapshot, or None if the hub stopped
+
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version or self._stopped.is_set(), timeout)
+            if self._stopped.is_set():
+                return None
+            return self._version, {"time": time.time(), "sensors": dict(self._readings)}
+
+    def start(self):
+        """Start serving clients on the Unix socket from a background thread."""
+        self._stopped.clear()
+        if self.socket_path is None or self._server is not None:
+            return
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _Handler)
+        self._server.daemon_threads = True
+        self._server.hub = self
+        threading.Thread(target=self._server.serve_forever, name="enviroplus-hub", daemon=True).start()
+
+    def stop(self):
+        """Stop polling and serving."""
+        with self._condition:
+            self._stopped.set()
+            self._condition.notify_all()
+        self._scheduler.stop()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            os.unlink(self.socket_path)
+
+    def run(self):
+        """Start serving and poll sensors until stop() is called."""
+        self.start()
+        self._scheduler.run()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _write_snapshot(self):
+        temp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            json.dump(self.snapshot(), f, default=float)
+        os.replace(temp, self.snapshot_path)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        hub = self.server.hub
+        command = self.rfile.readline().strip().decode() or "get"
+        try:
+            if command == "get":
+                self._send(hub.snapshot())
+            elif command == "watch":
+                version = None
+                while True:
+                    update = hub.wait(version)
+                    if update is None:
+                        return
+                    version, snapshot = update
+                    self._send(snapshot)
+            else:
+                self._send({"error": f"Unknown command {command!r}, expected get or watch"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send(self, snapshot):
+        self.wfile.write(json.dumps(snapshot, default=float).encode() + b"\n")
+        self.wfile.flush()
+
+
+def read(path=SOCKET_PATH, timeout=5.0):
+    """Return the current snapshot from a running hub.
+
+    :param path: Hub socket path
+    :param timeout: Seconds to wait for the hub
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(b"get\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def watch(path=SOCKET_PATH):
+    """Yield a snapshot from a running hub after every update.
+
+    :param path: Hub socket path
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(b"watch\n")
+        with sock.makefile("rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def read_snapshot(path):
+    """Return the snapshot from a hub's snapshot file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _add_sensors(hub, args):
+    """Add every enabled sensor that is connected.
+
+    :return: List of callables that stop any background readers
+
+    """
+    stoppers = []
+
+    if args.bme280 > 0:
+        try:
+            from smbus2 import SMBus
+        except ImportError:
+            from smbus import SMBus
+        from bme280 import BME280
+
+        bme280 = BME280(i2c_dev=SMBus(1))
+        hub.add_sensor("bme280", args.bme280, lambda: {"temperature": bme280.get_temperature(), "pressure": bme280.get_pressure(), "humidity": bme280.get_humidity()})
+
+    if args.ltr559 > 0:
+        from ltr559 import LTR559
+
+        try:
+            # Reads the part ID, so fails here if the chip is missing or the bus is down
+            ltr559 = LTR559()
+        except (RuntimeError, OSError) as e:
+            logger.warning("LTR559 not connected: %s", e)
+        else:
+            hub.add_sensor("ltr559", args.ltr559, lambda: {"lux": ltr559.get_lux(), "proximity": ltr559.get_proximity()})
+
+    if args.gas > 0:
+        from . import gas
+
+        if gas.available():
+            # Refresh the spare ADC pin once a minute as its own task, so gas reads never switch its gain
+            gas.enable_adc()
+            gas.set_adc_max_age(float("inf"))
+            hub.every(60.0, gas.refresh_adc)
+
+            def read_gas():
+                reading = gas.read_all()
+                return {"oxidising": reading.oxidising, "reducing": reading.reducing, "nh3": reading.nh3, "adc": reading.adc}
+
+            hub.add_sensor("gas", args.gas, read_gas)
+        else:
+            logger.warning("Gas sensor not connected")
+
+    if args.pms5003 > 0:
+        from .particulates import PMS5003Reader
+
+        # Frames are read, and the sensor reset on a timeout, on the reader's own thread
+        # so a slow or stalled serial read never holds up the other sensors
+        reader = PMS5003Reader()
+        try:
+            reader.start()
+        except (RuntimeError, OSError) as e:
+            logger.warning("PMS5003 not connected: %s", e)
+        else:
+            stoppers.append(reader.stop)
+
+            def read_pms5003():
+                # Frames arrive about once a second, an old one means the reader is failing
+                data = reader.latest(max_age=10.0)
+                if data is None:
+                    raise RuntimeError(f"No PMS5003 frame in the last 10s, {reader.errors} errors")
+                return {"pm1": data.pm_ug_per_m3(1.0), "pm25": data.pm_ug_per_m3(2.5), "pm10": data.pm_ug_per_m3(10)}
+
+            hub.add_sensor("pms5003", args.pms5003, read_pms5003)
+
+    if args.noise > 0:
+        from .noise import Noise
+
+        noise = Noise(duration=min(args.noise, 0.5))
+        noise.start()
+        stoppers.append(noise.stop)
+
+        def read_noise():
+            low, mid, high, total = noise.get_noise_profile()
+            return {"low": low, "mid": mid, "high": high, "total": total}
+
+        hub.add_sensor("noise", args.noise, read_noise)
+
+    return stoppers
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Enviro+ sensor hub, polls the sensors and serves their readings to any number of clients",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Sensor options take the seconds between reads, 0 disables the sensor.
+
+Reading from Python:
+  from enviroplus import hub
+  hub.read()                 # Latest snapshot
+  for snapshot in hub.watch():
+      ...
+        """,
+    )
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Unix socket to serve on (default {SOCKET_PATH})")
+    parser.add_argument("--snapshot", default=None, help="JSON file to replace on every update, eg: /dev/shm/enviroplus.json")
+    parser.add_argument("--bme280", type=float, default=1.0, metavar="SECONDS", help="BME280 temperature, pressure and humidity")
+    parser.add_argument("--ltr559", type=float, default=1.0, metavar="SECONDS", help="LTR559 light and proximity")
+    parser.add_argument("--gas", type=float, default=1.0, metavar="SECONDS", help="MICS6814 gas sensor")
+    parser.add_argument("--pms5003", type=float, default=1.0, metavar="SECONDS", help="PMS5003 particulate sensor")
+    parser.add_argument("--noise", type=float, default=0.0, metavar="SECONDS", help="Microphone noise profile (default off)")
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(asctime)s.%(msecs)03d %(levelname)-8s %(message)s", level=logging.INFO, datefmt="%Y-%m-%d %H:%M:%S")
+
+    hub = Hub(args.socket, args.snapshot)
+    stoppers = _add_sensors(hub, args)
+    if not hub.sensors:
+        logger.error("No sensors to poll")
+        sys.exit(1)
+    logger.info("Serving %s on %s", ", ".join(hub.sensors), args.socket)
+
+    try:
+        hub.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+        for stop in stoppers:
+            stop()
+
+
+if __name__ == "__main__":
+    main()
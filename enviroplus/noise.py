@@ -1,32 +1,399 @@
+import functools
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy
-import sounddevice
+
+from .audio import SAMPLE_FORMATS, SAMPLE_RATES, DeviceSource, FileSource, to_float  # noqa: F401 SAMPLE_RATES is re-exported
+
+try:
+    # scipy.fft keeps a cache of FFT plans between calls
+    from scipy import fft as _fft
+except ImportError:
+    _fft = numpy.fft
+
+
+def _next_fast_len(n):
+    """Return the smallest 2, 3 and 5-smooth number >= n, which FFTs handle quickly."""
+    best = 1 << max(n - 1, 0).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            quotient = -(-n // p35)
+            candidate = p35 << max(quotient - 1, 0).bit_length()
+            best = min(best, candidate)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+_WINDOWS = {
+    "hann": numpy.hanning,
+    "hamming": numpy.hamming,
+    "blackman": numpy.blackman,
+    "boxcar": numpy.ones,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _window(name, size, dtype):
+    """Return a periodic window of size points and its coherent gain."""
+    window = _WINDOWS[name](size + 1)[:-1].astype(dtype)
+    return window, window.mean()
+
+
+@functools.lru_cache(maxsize=8)
+def _weighting(name, sample_rate, fft_size, dtype):
+    """Return per-bin factors that turn an rfft power spectrum into weighted mean-square energy.
+
+    Combines the squared IEC 61672 A or C weighting gain, the one-sided spectrum
+    doubling and the Parseval 1/fft_size term. Divide the dot product by the
+    number of samples to get the mean square.
+
+    """
+    f2 = numpy.fft.rfftfreq(fft_size, 1.0 / sample_rate) ** 2
+    if name == "A":
+        gain = (12194.0**2 * f2**2) / ((f2 + 20.6**2) * numpy.sqrt((f2 + 107.7**2) * (f2 + 737.9**2)) * (f2 + 12194.0**2))
+        gain *= 10 ** (2.0 / 20)
+    elif name == "C":
+        gain = (12194.0**2 * f2) / ((f2 + 20.6**2) * (f2 + 12194.0**2))
+        gain *= 10 ** (0.062 / 20)
+    else:
+        gain = numpy.ones_like(f2)
+
+    factors = gain**2 * 2.0
+    factors[0] /= 2.0
+    if fft_size % 2 == 0:
+        factors[-1] /= 2.0
+    return (factors / fft_size).astype(dtype)
+
+
+@functools.lru_cache(maxsize=4)
+def _decimation_filter(factor, dtype):
+    """Return a linear-phase low-pass FIR for decimating by factor.
+
+    Hamming-windowed sinc with 20 taps per output phase, cutting off at 84% of
+    the decimated Nyquist frequency.
+
+    """
+    taps = 20 * factor + 1
+    k = numpy.arange(taps) - (taps - 1) / 2.0
+    cutoff = 0.42 / factor
+    h = numpy.sinc(2 * cutoff * k) * numpy.hamming(taps)
+    return (h / h.sum()).astype(dtype)
+
+
+def _hz_to_bin(hz, sample_rate, fft_size):
+    return int(numpy.rint(hz * fft_size / sample_rate))
+
+
+@functools.lru_cache(maxsize=8)
+def _octave_bands(fraction, sample_rate, fft_size):
+    """Return centre frequencies and FFT bin edges of the fractional-octave bands that fit the spectrum.
+
+    Edges are ascending, band i covers bins edges[i] to edges[i + 1].
+
+    """
+    if not isinstance(fraction, int) or fraction < 1:
+        raise ValueError("fraction must be a positive whole number of bands per octave")
+
+    ratio = 10 ** (3.0 / 10)
+    nyquist = sample_rate / 2.0
+    offset = 0.0 if fraction % 2 else 0.5
+
+    index = numpy.arange(-10 * fraction, 10 * fraction)
+    centres = 1000.0 * ratio ** ((index + offset) / fraction)
+    lower = centres * ratio ** (-0.5 / fraction)
+    upper = centres * ratio ** (0.5 / fraction)
+
+    lower_bins = numpy.rint(lower * fft_size / sample_rate).astype(numpy.intp)
+    upper_bins = numpy.rint(upper * fft_size / sample_rate).astype(numpy.intp)
+    keep = (centres > 19.0) & (upper <= nyquist) & (lower_bins >= 1) & (upper_bins > lower_bins)
+
+    centres = centres[keep]
+    edges = numpy.append(lower_bins[keep], upper_bins[keep][-1:])
+    return centres, edges
+
+
+@functools.lru_cache(maxsize=32)
+def _range_bins(ranges, sample_rate, fft_size):
+    """Return arrays of start and end FFT bins for a tuple of (start, end) ranges in Hz."""
+    bins = numpy.array(ranges, dtype=numpy.float64).reshape(-1, 2) * (fft_size / sample_rate)
+    bins = numpy.clip(numpy.rint(bins).astype(numpy.intp), 0, fft_size // 2 + 1)
+    return bins[:, 0], bins[:, 1]
+
+
+def _band_means(magnitude, starts, ends):
+    """Return the mean of magnitude[..., start:end] for every start, end pair.
+
+    Uses one prefix sum over the last axis, so the cost does not grow with band width.
+
+    """
+    cumulative = numpy.zeros(magnitude.shape[:-1] + (magnitude.shape[-1] + 1,))
+    numpy.cumsum(magnitude, axis=-1, out=cumulative[..., 1:])
+    return (cumulative[..., ends] - cumulative[..., starts]) / (ends - starts)
+
+
+@functools.lru_cache(maxsize=32)
+def _profile_bins(sample_rate, fft_size, noise_floor, low, mid, high):
+    """Return FFT bin slices for the low, mid and high bands of a noise profile."""
+    sample_count = (sample_rate // 2) - noise_floor
+
+    mid_start = noise_floor + int(sample_count * low)
+    high_start = mid_start + int(sample_count * mid)
+    noise_ceiling = high_start + int(sample_count * high)
+
+    noise_floor, mid_start, high_start, noise_ceiling = (_hz_to_bin(hz, sample_rate, fft_size) for hz in (noise_floor, mid_start, high_start, noise_ceiling))
+
+    return slice(noise_floor, mid_start), slice(mid_start, high_start), slice(high_start, noise_ceiling)
+
+
+def _profile_means(magnitude, low_bins, mid_bins, high_bins):
+    """Return the low, mid, high and total noise profile amplitudes over the last axis of magnitude."""
+    amp_low = numpy.mean(magnitude[..., low_bins], axis=-1)
+    amp_mid = numpy.mean(magnitude[..., mid_bins], axis=-1)
+    amp_high = numpy.mean(magnitude[..., high_bins], axis=-1)
+    amp_total = (amp_low + amp_mid + amp_high) / 3.0
+
+    return amp_low, amp_mid, amp_high, amp_total
+
+
+def _analyse_file_batch(settings, path, first, count, step, n, bands):
+    """Analyse one batch of file blocks in a worker process, see Noise.analyse_file()."""
+    noise = Noise(source=FileSource(path, sample_rate=settings["sample_rate"]), **settings)
+    return noise._analyse_blocks(noise.source.data, first, count, step, n, bands)
+
+
+class LevelMeter:
+    """Integrate sound levels into Leq, Lmax, Lmin and percentile levels.
+
+    Memory use is constant however long the meter runs: energy is kept as a
+    running sum and levels are counted into a fixed histogram with resolution
+    dB wide bins, which sets the precision of the percentile levels.
+
+    :param resolution: Histogram bin width in dB
+    :param floor: Lowest level, in dB, tracked by the histogram
+    :param ceiling: Highest level, in dB, tracked by the histogram
+
+    """
+
+    def __init__(self, resolution=0.1, floor=-120.0, ceiling=140.0):
+        self.resolution = resolution
+        self.floor = floor
+        self._histogram = numpy.zeros(int(numpy.rint((ceiling - floor) / resolution)) + 1)
+        self.reset()
+
+    def reset(self):
+        """Clear all accumulated levels."""
+        self._histogram[:] = 0
+        self._energy = 0.0
+        self.duration = 0.0
+        self.lmax = None
+        self.lmin = None
+
+    def add(self, level, duration=1.0):
+        """Add a level measured over duration seconds.
+
+        :param level: Level in dB, eg from Noise.get_level()
+        :param duration: Duration, in seconds, the level applies to
+
+        """
+        self._energy += 10 ** (level / 10.0) * duration
+        self.duration += duration
+        self.lmax = level if self.lmax is None else max(self.lmax, level)
+        self.lmin = level if self.lmin is None else min(self.lmin, level)
+        index = int(numpy.rint((level - self.floor) / self.resolution))
+        self._histogram[min(max(index, 0), len(self._histogram) - 1)] += duration
+
+    @property
+    def leq(self):
+        """Equivalent continuous level over everything added, in dB."""
+        if self.duration == 0:
+            return None
+        return 10 * numpy.log10(self._energy / self.duration)
+
+    def percentile(self, n):
+        """Return the level exceeded for n percent of the time, eg 90 for L90."""
+        if self.duration == 0:
+            return None
+        below = numpy.cumsum(self._histogram)
+        index = numpy.searchsorted(below, self.duration * (100.0 - n) / 100.0)
+        return self.floor + min(index, len(below) - 1) * self.resolution
+
+    @property
+    def l10(self):
+        return self.percentile(10)
+
+    @property
+    def l50(self):
+        return self.percentile(50)
+
+    @property
+    def l90(self):
+        return self.percentile(90)
+
+
+class _Spectrogram:
+    """Fixed-size circular store of spectrogram frames."""
+
+    def __init__(self, key, bins, dtype):
+        frames, segment = key[0], key[3]
+        self.key = key
+        self.data = numpy.zeros((frames, bins), dtype=dtype)
+        self.work = numpy.empty((frames, segment), dtype=dtype)
+        self.head = 0
+        self.position = None
+
+    def write(self, magnitude):
+        frames = len(self.data)
+        count = len(magnitude)
+        split = min(frames - self.head, count)
+        self.data[self.head : self.head + split] = magnitude[:split]
+        self.data[: count - split] = magnitude[split:]
+        self.head = (self.head + count) % frames
 
 
 class Noise:
-    def __init__(self, sample_rate=16000, duration=0.5):
+    def __init__(self, sample_rate=16000, duration=0.5, fft_size="auto", method="fft", segment=1024, overlap=0.5, window="hann", dtype="float32", decimate=1, source=None):
         """Noise measurement.
 
-        :param sample_rate: Sample rate in Hz
+        With method="welch" the capture is split into overlapping windowed segments
+        and their power spectra are averaged, giving steadier band levels from a
+        short capture. Levels are on the scale of a single segment-length FFT.
+
+        With decimate greater than 1 audio is low-pass filtered and downsampled
+        before analysis, so FFTs and buffers shrink by the same factor. Frequencies,
+        segment and hop lengths then refer to the decimated rate, analysis_rate.
+
+        :param sample_rate: Sample rate in Hz, one of SAMPLE_RATES for the microphone or the rate of a file source
         :param duraton: Duration, in seconds, of noise sample capture
+        :param fft_size: FFT length in points, "auto" for the next fast length that fits the capture or "hz" for the smallest multiple of sample_rate that does (1Hz resolution or finer)
+        :param method: "fft" for one FFT over the whole capture or "welch" for averaged segments
+        :param segment: Welch and spectrogram segment length in samples
+        :param overlap: Welch and spectrogram segment overlap (as a float, 0.5 = 50%)
+        :param window: Welch and spectrogram window, one of "hann", "hamming", "blackman" or "boxcar"
+        :param dtype: Sample format requested from the source, "float32" (default), "float64", "int16" or "int32". Integer samples are scaled to float32
+        :param decimate: Whole factor to downsample by before analysis, must divide sample_rate
+        :param source: Audio source, see enviroplus.audio, defaults to the ADAU7002 microphone
 
         """
 
+        if source is None:
+            source = DeviceSource()
+        source.check_sample_rate(sample_rate)
+
+        if not isinstance(decimate, int) or decimate < 1 or sample_rate % decimate:
+            raise ValueError("decimate must be a whole number that divides sample_rate")
+
+        if fft_size not in ("auto", "hz") and (not isinstance(fft_size, int) or fft_size < 2):
+            raise ValueError('fft_size must be "auto", "hz" or a number of points')
+
+        if method not in ("fft", "welch"):
+            raise ValueError('method must be "fft" or "welch"')
+
+        if segment < 2:
+            raise ValueError("segment must be at least 2 samples")
+
+        if not 0 <= overlap < 1:
+            raise ValueError("overlap must be at least 0 and less than 1")
+
+        if window not in _WINDOWS:
+            raise ValueError(f"window must be one of {', '.join(_WINDOWS)}")
+
+        if dtype not in SAMPLE_FORMATS:
+            raise ValueError(f"dtype must be one of {', '.join(SAMPLE_FORMATS)}")
+
         self.duration = duration
         self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.dtype = dtype
+        self.method = method
+        self.segment = segment
+        self.overlap = overlap
+        self.window = window
+        self.decimate = decimate
+        self.source = source
+
+        self._stream = None
+        self._finished = False
+        self._buffer = None
+        self._frames = 0
+        self._condition = threading.Condition()
+
+        self._magnitude_size = None
+        self._magnitude_buffer = None
+
+        self._spectrogram = None
+
+    def start(self, buffer_duration=None):
+        """Keep the microphone open and capture continuously.
+
+        Audio is written into a preallocated ring buffer from the stream callback,
+        and analysis methods read the most recent duration seconds from it
+        instead of opening the device for every capture.
+
+        If the stream ends, eg: at the end of a FileSource without loop, running
+        becomes False and a capture that needs more audio than arrived raises EOFError.
+
+        :param buffer_duration: Duration, in seconds, of audio to keep, defaults to duration
+
+        """
+        if self._stream is not None:
+            return
+
+        if buffer_duration is None or buffer_duration < self.duration:
+            buffer_duration = self.duration
+
+        self._buffer = numpy.zeros((int(buffer_duration * self.sample_rate) + self._history, 1), dtype=self.dtype)
+        self._frames = 0
+        self._finished = False
+        self._spectrogram = None
+        self._stream = self.source.open_stream(self.sample_rate, self.dtype, self._callback, self._finished_callback)
+        self._stream.start()
+
+    def stop(self):
+        """Close the microphone opened by start()."""
+        if self._stream is None:
+            return
+
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+        with self._condition:
+            self._condition.notify_all()
+
+    @property
+    def running(self):
+        return self._stream is not None and not self._finished
+
+    @property
+    def analysis_rate(self):
+        """Sample rate, in Hz, of the audio after decimation."""
+        return self.sample_rate // self.decimate
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
 
     def get_amplitudes_at_frequency_ranges(self, ranges):
         """Return the mean amplitude of frequencies in the given ranges.
 
+        All ranges are computed in one vectorised step from a prefix sum of the spectrum.
+
         :param ranges: List of ranges including a start and end range
 
+        :return: numpy.ndarray with one mean amplitude per range
+
         """
-        recording = self._record()
-        magnitude = numpy.abs(numpy.fft.rfft(recording[:, 0], n=self.sample_rate))
-        result = []
-        for r in ranges:
-            start, end = r
-            result.append(numpy.mean(magnitude[start:end]))
-        return result
+        starts, ends = _range_bins(tuple((start, end) for start, end in ranges), self.analysis_rate, self._fft_length())
+        magnitude = self._magnitude(self._record())
+        return _band_means(magnitude, starts, ends)
 
     def get_amplitude_at_frequency_range(self, start, end):
         """Return the mean amplitude of frequencies in the specified range.
@@ -35,12 +402,15 @@ class Noise:
         :param end: End frequency (in Hz)
 
         """
-        n = self.sample_rate // 2
+        n = self.analysis_rate // 2
         if start > n or end > n:
             raise ValueError(f"Maximum frequency is {n}")
 
-        recording = self._record()
-        magnitude = numpy.abs(numpy.fft.rfft(recording[:, 0], n=self.sample_rate))
+        n = self._fft_length()
+        start = _hz_to_bin(start, self.analysis_rate, n)
+        end = _hz_to_bin(end, self.analysis_rate, n)
+
+        magnitude = self._magnitude(self._record())
         return numpy.mean(magnitude[start:end])
 
     def get_noise_profile(self, noise_floor=100, low=0.12, mid=0.36, high=None):
@@ -58,21 +428,378 @@ class Noise:
         if high is None:
             high = 1.0 - low - mid
 
-        recording = self._record()
-        magnitude = numpy.abs(numpy.fft.rfft(recording[:, 0], n=self.sample_rate))
+        bins = _profile_bins(self.analysis_rate, self._fft_length(), noise_floor, low, mid, high)
+        magnitude = self._magnitude(self._record())
+
+        return _profile_means(magnitude, *bins)
+
+    def analyse_file(self, path, block=None, ranges=None, noise_floor=100, low=0.12, mid=0.36, high=None, batch=64, workers=None):
+        """Analyse a recording block by block, as if each block were a live capture.
+
+        The file is memory-mapped and split into consecutive blocks. Up to batch blocks
+        are gathered into a 2D array and transformed with one FFT call. With workers set
+        the batches are spread over that many processes, each mapping the file itself.
+        Each result matches get_amplitudes_at_frequency_ranges(), or get_noise_profile()
+        if no ranges are given, for the same audio.
+
+        :param path: WAV or .npy file recorded at sample_rate, see enviroplus.audio.FileSource
+        :param block: Block length in seconds, defaults to duration
+        :param ranges: List of ranges including a start and end range, or None for a noise profile
+        :param noise_floor: Noise profile "High-pass" frequency, see get_noise_profile()
+        :param low: Noise profile low bin percentage, see get_noise_profile()
+        :param mid: Noise profile mid bin percentage, see get_noise_profile()
+        :param high: Noise profile high bin percentage, see get_noise_profile()
+        :param batch: Number of blocks per FFT call
+        :param workers: Number of worker processes, None to analyse in this process
+
+        :return: Generator of (time, result) tuples, where time is the start of the block in seconds
+
+        """
+        if block is None:
+            block = self.duration
+
+        if high is None:
+            high = 1.0 - low - mid
+
+        if ranges is not None:
+            ranges = tuple((start, end) for start, end in ranges)
+
+        source = FileSource(path, sample_rate=self.sample_rate)
+        step = int(block * self.analysis_rate) * self.decimate
+        n = self._fft_length(self.segment if self.method == "welch" else step // self.decimate)
+        bands = ranges, noise_floor, low, mid, high
+
+        blocks = max(0, (len(source) - self._history) // step)
+        firsts = range(0, blocks, batch)
+        counts = [min(batch, blocks - first) for first in firsts]
+
+        executor = None
+        if workers is None:
+            batches = map(functools.partial(self._analyse_blocks, source.data), firsts, counts, itertools.repeat(step), itertools.repeat(n), itertools.repeat(bands))
+        else:
+            settings = {
+                "sample_rate": self.sample_rate,
+                "duration": self.duration,
+                "fft_size": self.fft_size,
+                "method": self.method,
+                "segment": self.segment,
+                "overlap": self.overlap,
+                "window": self.window,
+                "dtype": self.dtype,
+                "decimate": self.decimate,
+            }
+            executor = ProcessPoolExecutor(max_workers=workers)
+            batches = executor.map(_analyse_file_batch, itertools.repeat(settings), itertools.repeat(source.path), firsts, counts, itertools.repeat(step), itertools.repeat(n), itertools.repeat(bands))
+
+        try:
+            for first, results in zip(firsts, batches):
+                for index, result in enumerate(results, first):
+                    yield index * step / float(self.sample_rate), result if ranges is not None else tuple(result)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _analyse_blocks(self, data, first, count, step, n, bands):
+        """Return the band results for count blocks of data, starting with block first.
+
+        Blocks are step frames apart and each includes the decimation history, as _record() does.
+
+        """
+        start = first * step
+        samples = numpy.asarray(data[start : start + count * step + self._history, 0])
+        samples = to_float(samples, samples.dtype.name).astype(self._float_dtype, copy=False)
+        blocks = numpy.lib.stride_tricks.sliding_window_view(samples, step + self._history)[::step]
+
+        magnitude = self._spectrum(self._decimate(blocks), n)
+
+        ranges, noise_floor, low, mid, high = bands
+        if ranges is not None:
+            starts, ends = _range_bins(ranges, self.analysis_rate, n)
+            return _band_means(magnitude, starts, ends)
+
+        bins = _profile_bins(self.analysis_rate, n, noise_floor, low, mid, high)
+        return numpy.stack(_profile_means(magnitude, *bins), axis=-1)
+
+    def get_level(self, weighting="A", calibration=0.0):
+        """Return the frequency-weighted sound level of a capture in dB.
+
+        Levels are relative to a full-scale signal with an RMS of 1.0, add the
+        microphone's calibration offset to get dB SPL. The weighting curves are
+        computed once per FFT size.
+
+        :param weighting: "A", "C" or "Z" (unweighted)
+        :param calibration: Offset, in dB, added to the result
+
+        """
+        if weighting not in ("A", "C", "Z"):
+            raise ValueError('weighting must be "A", "C" or "Z"')
+
+        energy = self._weighted_energy(self._record()[:, 0], weighting)
+
+        return 10 * numpy.log10(max(float(energy.sum()), 1e-20)) + calibration
+
+    def get_octave_bands(self, fraction=3, weighting="Z", calibration=0.0):
+        """Return IEC 61260 octave or fractional-octave band levels for a capture.
+
+        Bands are base-10 series centred on 1kHz, from 20Hz, or the lowest band wide
+        enough to hold an FFT bin, up to the last band below Nyquist. The band edges are
+        precomputed per FFT size and all bands are summed in one numpy.add.reduceat.
+        Band levels add up, by energy, to get_level() with the same weighting.
+
+        :param fraction: Bands per octave, 1 for octaves or 3 for third-octaves
+        :param weighting: "A", "C" or "Z" (unweighted)
+        :param calibration: Offset, in dB, added to each level
+
+        :return: Tuple of numpy.ndarray band centre frequencies and levels in dB
+
+        """
+        if weighting not in ("A", "C", "Z"):
+            raise ValueError('weighting must be "A", "C" or "Z"')
+
+        samples = self._record()[:, 0]
+        n = _next_fast_len(len(samples))
+        centres, edges = _octave_bands(fraction, self.analysis_rate, n)
+
+        energy = self._weighted_energy(samples, weighting)
+        bands = numpy.add.reduceat(energy[: edges[-1]], edges[:-1])
+
+        return centres, 10 * numpy.log10(numpy.maximum(bands, 1e-20)) + calibration
+
+    def _weighted_energy(self, samples, weighting):
+        """Return the per-bin contribution of a capture to its weighted mean square."""
+        n = _next_fast_len(len(samples))
+        factors = _weighting(weighting, self.analysis_rate, n, self._float_dtype)
+
+        spectrum = _fft.rfft(samples, n=n)
+        energy = spectrum.real**2 + spectrum.imag**2
+        energy *= factors
+        energy /= len(samples)
+        return energy
+
+    def spectrogram(self, frames=64, hop=None):
+        """Return a magnitude spectrogram of the most recent audio.
+
+        Each frame is the FFT of one windowed segment, with frames hop samples apart,
+        corrected for the window's coherent gain so magnitudes are on the same scale
+        as method="welch" with the same segment and window. Frames are kept in a fixed-size circular array, so memory stays bounded.
+        While streaming only audio that arrived since the last call is transformed,
+        otherwise a new capture is recorded and analysed.
+
+        :param frames: Number of frames to keep
+        :param hop: Samples between frames, defaults to segment * (1 - overlap)
 
-        sample_count = (self.sample_rate // 2) - noise_floor
+        :return: numpy.ndarray of shape (frames, bins), oldest frame first
 
-        mid_start = noise_floor + int(sample_count * low)
-        high_start = mid_start + int(sample_count * mid)
-        noise_ceiling = high_start + int(sample_count * high)
+        """
+        self._update_spectrogram(frames, hop)
+        state = self._spectrogram
+        return numpy.roll(state.data, -state.head, axis=0)
+
+    def iter_spectrogram(self, frames=64, hop=None):
+        """Yield new spectrogram frames as audio arrives.
+
+        Requires a running stream, see start(). Each frame is a view into the
+        circular array used by spectrogram() and is only valid until it is
+        overwritten, frames later. Iteration ends when the stream is stopped.
+
+        :param frames: Number of frames to keep
+        :param hop: Samples between frames, defaults to segment * (1 - overlap)
+
+        """
+        if self._stream is None:
+            raise RuntimeError("iter_spectrogram() needs a running stream, call start() first")
+
+        while True:
+            count = min(self._update_spectrogram(frames, hop), frames)
+            state = self._spectrogram
+            for offset in range(count, 0, -1):
+                yield state.data[(state.head - offset) % frames]
+
+            with self._condition:
+                self._condition.wait_for(lambda state=state: self._frames >= self._next_frame_ready(state.position) or self._stream is None or self._finished)
+                if self._stream is None or self._frames < self._next_frame_ready(state.position):
+                    return
+
+    def _update_spectrogram(self, frames, hop):
+        """Transform any new audio into spectrogram frames, returning how many were added."""
+        if hop is None:
+            hop = max(1, int(self.segment * (1.0 - self.overlap)))
+
+        n = self._fft_length(self.segment)
+        key = (frames, hop, n, self.segment)
+        state = self._spectrogram
+        if state is None or state.key != key:
+            state = self._spectrogram = _Spectrogram(key, n // 2 + 1, self._float_dtype)
+
+        if self._stream is not None:
+            samples, start = self._since(state.position)
+        else:
+            samples, start = self._record()[:, 0], 0
+
+        count = max(0, (len(samples) - self.segment) // hop + 1)
+        if count == 0:
+            return 0
+
+        # Only the newest frames fit in the circular array, skip the rest
+        skip = max(0, count - frames)
+        segments = numpy.lib.stride_tricks.sliding_window_view(samples, self.segment)[skip * hop :: hop][: count - skip]
+        window, gain = _window(self.window, self.segment, self._float_dtype)
+
+        work = state.work[: len(segments)]
+        numpy.multiply(segments, window, out=work)
+        magnitude = numpy.abs(_fft.rfft(work, n=n, axis=-1))
+        # Undo the window's coherent gain, as the Welch path does, so the two share a scale
+        magnitude /= gain
+        state.write(magnitude)
+        state.position = start + count * hop * self.decimate
+        return count
+
+    def _next_frame_ready(self, position):
+        """Return the stream frame count at which a segment starting at position is complete."""
+        if position is None:
+            position = self._history
+        return position + (self.segment - 1) * self.decimate + 1
+
+    def _fft_length(self, samples=None):
+        """Return the FFT length for the given, or current capture, length and fft_size policy."""
+        if samples is None:
+            samples = self.segment if self.method == "welch" else int(self.duration * self.analysis_rate)
+        if self.fft_size == "auto":
+            return _next_fast_len(samples)
+        if self.fft_size == "hz":
+            return max(1, -(-samples // self.analysis_rate)) * self.analysis_rate
+        return self.fft_size
+
+    def _magnitude(self, recording):
+        """Return the magnitude spectrum of the first channel of recording.
+
+        The result is written into a buffer that is reused by the next call.
+
+        """
+        n = self._fft_length()
+        if self._magnitude_size != n:
+            self._magnitude_buffer = numpy.empty(n // 2 + 1, dtype=self._float_dtype)
+            self._magnitude_size = n
+
+        return self._spectrum(recording[:, 0], n, out=self._magnitude_buffer)
+
+    def _spectrum(self, samples, n, out=None):
+        """Return the magnitude spectrum of samples along their last axis.
+
+        A 2D array of captures is transformed in one batched FFT.
 
-        amp_low = numpy.mean(magnitude[noise_floor:mid_start])
-        amp_mid = numpy.mean(magnitude[mid_start:high_start])
-        amp_high = numpy.mean(magnitude[high_start:noise_ceiling])
-        amp_total = (amp_low + amp_mid + amp_high) / 3.0
+        """
+        if self.method == "welch":
+            return self._welch(samples, n, out)
+
+        return numpy.abs(_fft.rfft(samples, n=n, axis=-1), out=out)
+
+    def _welch(self, samples, n, out=None):
+        """Return the Welch-averaged magnitude spectrum of samples.
+
+        Segments are strided views into samples, transformed together with one FFT.
+
+        """
+        if samples.shape[-1] < self.segment:
+            raise ValueError(f"Capture of {samples.shape[-1]} samples is shorter than segment ({self.segment})")
+
+        step = max(1, int(self.segment * (1.0 - self.overlap)))
+        segments = numpy.lib.stride_tricks.sliding_window_view(samples, self.segment, axis=-1)[..., ::step, :]
+        window, gain = _window(self.window, self.segment, self._float_dtype)
+
+        spectrum = _fft.rfft(segments * window, n=n, axis=-1)
+        power = numpy.mean(spectrum.real**2 + spectrum.imag**2, axis=-2)
+        magnitude = numpy.sqrt(power, out=out)
+        magnitude /= gain
+        return magnitude
+
+    def _callback(self, indata, frames, time, status):
+        with self._condition:
+            size = len(self._buffer)
+            count = min(frames, size)
+            indata = indata[frames - count :]
+            start = (self._frames + frames - count) % size
+            split = min(size - start, count)
+            self._buffer[start : start + split] = indata[:split]
+            self._buffer[: count - split] = indata[split:]
+            self._frames += frames
+            self._condition.notify_all()
+
+    def _finished_callback(self):
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+
+    def _latest(self, count):
+        """Return the most recent count frames from the ring buffer, oldest first."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._frames >= count or self._stream is None or self._finished)
+            if self._frames < count:
+                if self._stream is not None:
+                    raise EOFError("Noise stream ended before enough audio was captured.")
+                raise RuntimeError("Noise stream stopped before enough audio was captured.")
+            return self._copy(self._frames - count, count)
+
+    def _since(self, position):
+        """Return the analysis samples for all buffered frames from position onwards, and where they start.
 
-        return amp_low, amp_mid, amp_high, amp_total
+        Sample i of the result lines up with stream frame position + i * decimate. If
+        position is None, or has already been overwritten, everything still buffered is returned.
+
+        """
+        history = self._history
+        with self._condition:
+            oldest = max(0, self._frames - len(self._buffer)) + history
+            if position is None or position < oldest:
+                position = oldest
+            position = min(position, self._frames)
+            recording = self._copy(position - history, self._frames - position + history)
+        return self._decimate(self._to_float(recording)[:, 0]), position
+
+    def _copy(self, position, count):
+        """Return a contiguous copy of count frames from the ring buffer, starting at stream position."""
+        size = len(self._buffer)
+        start = position % size
+        if start + count <= size:
+            return self._buffer[start : start + count].copy()
+        return numpy.concatenate((self._buffer[start:], self._buffer[: start + count - size]))
+
+    @property
+    def _float_dtype(self):
+        return "float64" if self.dtype == "float64" else "float32"
+
+    @property
+    def _history(self):
+        """Number of extra frames the decimation filter needs before the first output."""
+        if self.decimate == 1:
+            return 0
+        return len(_decimation_filter(self.decimate, self._float_dtype)) - 1
+
+    def _decimate(self, samples):
+        """Low-pass filter and downsample samples by decimate along their last axis.
+
+        Only every decimate'th filter output is evaluated, the cost of a polyphase
+        decimator, and only outputs with a full filter history are returned.
+
+        """
+        if self.decimate == 1:
+            return samples
+        taps = _decimation_filter(self.decimate, self._float_dtype)
+        if samples.shape[-1] < len(taps):
+            return samples[..., :0]
+        return numpy.lib.stride_tricks.sliding_window_view(samples, len(taps), axis=-1)[..., :: self.decimate, :] @ taps
 
     def _record(self):
-        return sounddevice.rec(int(self.duration * self.sample_rate), device="adau7002", samplerate=self.sample_rate, blocking=True, channels=1, dtype="float64")
+        count = int(self.duration * self.sample_rate) + self._history
+        if self._stream is not None:
+            recording = self._latest(count)
+        else:
+            recording = self.source.read(count, self.sample_rate, self.dtype)
+
+        recording = self._to_float(recording)
+        if self.decimate > 1:
+            recording = self._decimate(recording[:, 0])[:, numpy.newaxis]
+        return recording
+
+    def _to_float(self, recording):
+        return to_float(recording, self.dtype)
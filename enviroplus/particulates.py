@@ -0,0 +1,119 @@
+"""Read the PMS5003 particulate sensor on a background thread.
+
+The PMS5003 sends a frame over the UART about once a second, and
+PMS5003.read() blocks until the next one arrives. PMS5003Reader reads frames
+continuously into a ring buffer so consumers get the latest frame, or an
+average, straight away.
+
+    reader = PMS5003Reader()
+    reader.start()
+    reader.latest().pm_ug_per_m3(2.5)
+    reader.mean(60.0, 2.5)
+
+"""
+
+import logging
+import time
+
+from pms5003 import PMS5003, ReadTimeoutError, SerialTimeoutError
+
+from .background import BackgroundReader
+
+logger = logging.getLogger(__name__)
+
+
+class PMS5003Reader(BackgroundReader):
+    """Continuous PMS5003 reading on a background thread.
+
+    Frames are kept, with the monotonic time they arrived, in a bounded ring
+    buffer, the oldest are discarded once it is full.
+
+    A read timeout resets the sensor, a serial timeout (nothing connected)
+    or a serial port error waits before trying again and a corrupt frame is
+    skipped. None of these stop the thread. They are counted in errors, and
+    latest(max_age=...) shows when frames have stopped arriving.
+
+    """
+
+    def __init__(self, pms5003=None, size=600, callback=None, retry_delay=1.0):
+        """Set up a reader.
+
+        :param pms5003: pms5003.PMS5003 instance, one is created on start() if None
+        :param size: Number of frames to keep, 600 is about ten minutes
+        :param callback: Called with each new frame, on the reader thread
+        :param retry_delay: Seconds to wait after a serial timeout or error
+
+        """
+        BackgroundReader.__init__(self, size, "pms5003-reader")
+        self.pms5003 = pms5003
+        self.callback = callback
+        self.retry_delay = retry_delay
+
+    def start(self):
+        """Start reading frames."""
+        if self._running:
+            return
+        if self.pms5003 is None:
+            self.pms5003 = PMS5003()
+        BackgroundReader.start(self)
+
+    def frames(self, window_s=None):
+        """Return a list of buffered frames, oldest first.
+
+        :param window_s: Only return frames from the last window_s seconds
+
+        """
+        with self._condition:
+            if window_s is None:
+                return [frame for _, frame in self._items]
+            since = time.monotonic() - window_s
+            return [frame for timestamp, frame in self._items if timestamp >= since]
+
+    def mean(self, window_s, size=2.5, atmospheric_environment=False):
+        """Return the mean particle concentration over the last window_s seconds.
+
+        :param window_s: Seconds of frames to average
+        :param size: Particle size, 1.0, 2.5 or 10, see PMS5003Data.pm_ug_per_m3()
+        :param atmospheric_environment: Use the atmospheric rather than standard particle concentration
+
+        :return: Concentration in ug/m3, or None if there are no frames in the window
+
+        """
+        values = [frame.pm_ug_per_m3(size, atmospheric_environment) for frame in self.frames(window_s)]
+        if not values:
+            return None
+        return sum(values) / float(len(values))
+
+    def _run(self):
+        while self._running:
+            try:
+                frame = self.pms5003.read()
+            except ReadTimeoutError as e:
+                self._error("Timed out reading PMS5003, resetting: %s", e)
+                try:
+                    self.pms5003.reset()
+                except OSError as e:
+                    self._error("Failed to reset PMS5003: %s", e)
+                    self._wait(self.retry_delay)
+                continue
+            except SerialTimeoutError as e:
+                self._error("No data from PMS5003: %s", e)
+                self._wait(self.retry_delay)
+                continue
+            except RuntimeError as e:
+                # Checksum or frame length error, read() resyncs on the next start of frame
+                self._error("Bad PMS5003 frame: %s", e)
+                continue
+            except OSError as e:
+                # serial.SerialException is an OSError, eg: when the port goes away
+                self._error("Failed to read PMS5003: %s", e)
+                self._wait(self.retry_delay)
+                continue
+
+            self._publish(frame)
+
+            if self.callback is not None:
+                try:
+                    self.callback(frame)
+                except Exception:
+                    logger.exception("PMS5003 frame callback failed")
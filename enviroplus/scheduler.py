@@ -0,0 +1,153 @@
+"""Run periodic tasks, each at its own rate.
+
+Tasks are kept in a heap ordered by when they are next due, on the
+monotonic clock. The scheduler sleeps until the earliest one is due rather
+than polling, so a slow sensor never holds back a fast one and nothing
+spins between reads.
+
+    scheduler = Scheduler()
+    scheduler.every(1.0, read_gas)
+    scheduler.every(0.5, read_noise)
+    scheduler.every(60.0, publish, delay=60.0)
+    scheduler.run()
+
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class Task:
+    __slots__ = "args", "cancelled", "func", "next_time", "period"
+
+    def __init__(self, period, func, args, next_time):
+        self.period = period
+        self.func = func
+        self.args = args
+        self.next_time = next_time
+        self.cancelled = False
+
+    def __repr__(self):
+        return f"Task(period={self.period}, func={getattr(self.func, '__name__', self.func)})"
+
+
+class Scheduler:
+    def __init__(self):
+        """Run periodic tasks on the calling thread, see run()."""
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._changed = False
+
+    def every(self, period, func, *args, delay=0.0):
+        """Call func(*args) every period seconds.
+
+        Safe to call from another thread while run() is waiting.
+
+        :param period: Seconds between calls
+        :param func: Callable to run
+        :param delay: Seconds before the first call
+
+        :return: Task, which can be passed to cancel()
+
+        """
+        if period <= 0:
+            raise ValueError("period must be greater than zero")
+
+        task = Task(period, func, args, time.monotonic() + delay)
+        with self._condition:
+            self._push(task)
+            self._changed = True
+            self._condition.notify()
+        return task
+
+    def cancel(self, task):
+        """Stop running task."""
+        with self._condition:
+            task.cancelled = True
+            self._changed = True
+            self._condition.notify()
+
+    def run_pending(self):
+        """Run every task that is due, stopping early if stop() is called.
+
+        :return: Seconds until the next task is due, or None if there are no tasks
+
+        """
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return self._next_delay()
+                task = self._pop_due()
+                if task is None:
+                    return self._next_delay()
+
+            try:
+                task.func(*task.args)
+            finally:
+                with self._condition:
+                    if not task.cancelled:
+                        task.next_time += task.period
+                        now = time.monotonic()
+                        if task.next_time < now:
+                            # Fell behind, resynchronise rather than bursting to catch up
+                            task.next_time = now + task.period
+                        self._push(task)
+
+    def run(self):
+        """Run tasks as they fall due until stop() is called or no tasks are left.
+
+        Exceptions raised by a task propagate out of run(), the task stays scheduled.
+
+        """
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+            self.run_pending()
+            with self._condition:
+                delay = self._next_delay()
+                if self._stopped or delay is None:
+                    return
+                # Sleep until the next task is due, every(), cancel() and stop() wake us early
+                self._changed = False
+                self._condition.wait_for(lambda: self._stopped or self._changed, delay)
+
+    def stop(self):
+        """Make run() return once the task in progress, if any, finishes.
+
+        A stopped scheduler stays stopped, run() returns straight away.
+
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def __len__(self):
+        with self._condition:
+            return sum(not task.cancelled for _, _, task in self._heap)
+
+    def _push(self, task):
+        heapq.heappush(self._heap, (task.next_time, next(self._counter), task))
+
+    def _pop_due(self):
+        now = time.monotonic()
+        while self._heap:
+            next_time, _, task = self._heap[0]
+            if task.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if next_time > now:
+                return None
+            return heapq.heappop(self._heap)[2]
+        return None
+
+    def _next_delay(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
@@ -0,0 +1,98 @@
+"""Sunrise and sunset times for the weather examples, from astral.
+
+Looking a city up rebuilds astral's geocoder database, and each sun()
+call works through the solar equations. SunTimes looks the city up once
+and works out the sun events only when the local date changes, so asking
+where we are in the current day or night is cheap enough to do every frame.
+
+    sun_times = SunTimes("Sheffield", "Europe/London")
+    progress, period, day, local_dt = sun_times.period()
+
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from astral.geocoder import database, lookup
+from astral.sun import sun
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class SunTimes:
+    def __init__(self, city_name, time_zone=None):
+        """Sun events for a city, cached by local date.
+
+        :param city_name: City name known to astral's geocoder, eg: "Sheffield"
+        :param time_zone: IANA time zone name, eg: "Europe/London", defaults to the city's own
+
+        """
+        self.city = lookup(city_name, database())
+        self.time_zone = ZoneInfo(time_zone or self.city.timezone)
+        self._date = None
+        self._events = None
+
+    def events(self, date):
+        """Return sunset yesterday, sunrise and sunset on date, and sunrise tomorrow.
+
+        Only works the events out again when date differs from the last call.
+
+        :param date: Local date
+
+        """
+        if date != self._date:
+            observer = self.city.observer
+            sun_yesterday = sun(observer, date=date - timedelta(1), tzinfo=self.time_zone)
+            sun_today = sun(observer, date=date, tzinfo=self.time_zone)
+            sun_tomorrow = sun(observer, date=date + timedelta(1), tzinfo=self.time_zone)
+            self._events = (sun_yesterday["sunset"], sun_today["sunrise"], sun_today["sunset"], sun_tomorrow["sunrise"])
+            self._date = date
+        return self._events
+
+    def period(self, now=None):
+        """Return progress through the current day or night.
+
+        :param now: Time to use, an aware datetime, defaults to the current time
+
+        :return: (progress in seconds, period length in seconds, True if it is day, local datetime)
+
+        """
+        if now is None:
+            now = datetime.now(tz=timezone.utc)
+        local_dt = now.astimezone(self.time_zone)
+        sunset_yesterday, sunrise_today, sunset_today, sunrise_tomorrow = self.events(local_dt.date())
+
+        if sunrise_today < local_dt < sunset_today:
+            day = True
+            period = sunset_today - sunrise_today
+            progress = local_dt - sunrise_today
+        elif local_dt > sunset_today:
+            day = False
+            period = sunrise_tomorrow - sunset_today
+            progress = local_dt - sunset_today
+        else:
+            day = False
+            period = sunrise_today - sunset_yesterday
+            progress = local_dt - sunset_yesterday
+
+        return (progress.total_seconds(), period.total_seconds(), day, local_dt)
+
+
+def sun_period(city_name, time_zone=None, now=None):
+    """Return progress through the current day or night, see SunTimes.period().
+
+    SunTimes are shared between calls, one per city and time zone.
+
+    :param city_name: City name known to astral's geocoder
+    :param time_zone: IANA time zone name, defaults to the city's own
+    :param now: Time to use, an aware datetime, defaults to the current time
+
+    """
+    key = (city_name, time_zone)
+    with _cache_lock:
+        sun_times = _cache.get(key)
+        if sun_times is None:
+            sun_times = _cache[key] = SunTimes(city_name, time_zone)
+    return sun_times.period(now)
@@ -25,7 +25,7 @@ class SMBusFakeDeviceNoTimeout(MockSMBus):
 @pytest.fixture(scope="function", autouse=True)
 def cleanup():
     yield None
-    modules = "enviroplus", "enviroplus.noise", "enviroplus.gas", "ads1015", "i2cdevice"
+    modules = "enviroplus", "enviroplus.aio", "enviroplus.audio", "enviroplus.noise", "enviroplus.gas", "enviroplus.particulates", "enviroplus.solar", "enviroplus.assets", "ads1015", "i2cdevice"
     for module in modules:
         try:
             del sys.modules[module]
@@ -109,10 +109,61 @@ def sounddevice():
     del sys.modules["sounddevice"]
 
 
+@pytest.fixture(scope="function", autouse=False)
+def pms5003():
+    """Mock pms5003 module."""
+    pms5003 = mock.MagicMock()
+    pms5003.ReadTimeoutError = type("ReadTimeoutError", (RuntimeError,), {})
+    pms5003.SerialTimeoutError = type("SerialTimeoutError", (RuntimeError,), {})
+    sys.modules["pms5003"] = pms5003
+    yield pms5003
+    del sys.modules["pms5003"]
+
+
+@pytest.fixture(scope="function", autouse=False)
+def ltr559():
+    """Mock ltr559 module."""
+    ltr559 = mock.MagicMock()
+    sys.modules["ltr559"] = ltr559
+    yield ltr559
+    del sys.modules["ltr559"]
+
+
+@pytest.fixture(scope="function", autouse=False)
+def astral():
+    """Mock astral module."""
+    astral = mock.MagicMock()
+    sys.modules["astral"] = astral
+    sys.modules["astral.geocoder"] = astral.geocoder
+    sys.modules["astral.sun"] = astral.sun
+    yield astral
+    del sys.modules["astral.sun"]
+    del sys.modules["astral.geocoder"]
+    del sys.modules["astral"]
+
+
+@pytest.fixture(scope="function", autouse=False)
+def PIL():
+    """Mock PIL and fonts modules."""
+    PIL = mock.MagicMock()
+    sys.modules["PIL"] = PIL
+    sys.modules["fonts"] = mock.MagicMock()
+    sys.modules["fonts.ttf"] = sys.modules["fonts"].ttf
+    yield PIL
+    del sys.modules["fonts.ttf"]
+    del sys.modules["fonts"]
+    del sys.modules["PIL"]
+
+
 @pytest.fixture(scope="function", autouse=False)
 def numpy():
     """Mock numpy module."""
+    original = sys.modules.get("numpy")
     numpy = mock.MagicMock()
     sys.modules["numpy"] = numpy
     yield numpy
-    del sys.modules["numpy"]
+    if original is None:
+        del sys.modules["numpy"]
+    else:
+        # Put real numpy back, re-importing it over its cached submodules breaks it
+        sys.modules["numpy"] = original
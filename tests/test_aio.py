@@ -0,0 +1,40 @@
+import asyncio
+from unittest import mock
+
+
+def test_aio_read_all(gpiod, gpiodevice, smbus):
+    from enviroplus import aio, gas
+
+    gas._is_setup = False
+    result = asyncio.run(aio.read_all_async())
+    aio.shutdown()
+
+    assert int(result.oxidising) == 16641
+
+
+def test_aio_concurrent_reads(gpiod, gpiodevice, smbus, sounddevice, numpy):
+    from enviroplus import aio, gas
+    from enviroplus.noise import Noise
+
+    numpy.mean.return_value = 10.0
+
+    gas._is_setup = False
+    noise = Noise(sample_rate=16000, duration=0.1)
+    bme280 = mock.Mock()
+    bme280.get_temperature.return_value = 21.0
+    bme280.get_pressure.return_value = 1013.0
+    bme280.get_humidity.return_value = 40.0
+
+    async def poll():
+        return await asyncio.gather(
+            aio.read_channels_async(("nh3",)),
+            aio.get_noise_profile_async(noise),
+            aio.read_bme280_async(bme280),
+        )
+
+    reading, profile, weather = asyncio.run(poll())
+    aio.shutdown()
+
+    assert int(reading.nh3) > 0
+    assert profile[3] == 10.0
+    assert weather == (21.0, 1013.0, 40.0)
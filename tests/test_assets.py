@@ -0,0 +1,28 @@
+def test_assets(PIL, tmp_path):
+    from enviroplus.assets import Assets
+
+    for name in ("temperature.png", "bulb-dim.png", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+
+    assets = Assets(str(tmp_path), "Roboto.ttf")
+    assets.load_icons()
+    assert PIL.Image.open.call_count == 2
+
+    icon = assets.icon("temperature")
+    assert icon is assets.icon("temperature")
+    assert PIL.Image.open.call_count == 2
+    PIL.Image.open.return_value.__enter__.return_value.convert.assert_called_with("RGBA")
+
+    font = assets.font(12)
+    assert font is assets.font(12)
+    assets.font(14)
+    assert PIL.ImageFont.truetype.call_args_list == [(("Roboto.ttf", 12),), (("Roboto.ttf", 14),)]
+
+
+def test_get_font(PIL):
+    from enviroplus import assets
+
+    assets.get_font(12)
+    assets.get_font(12)
+    assert PIL.ImageFont.truetype.call_count == 1
+    assert assets.get_assets() is assets.get_assets()
@@ -0,0 +1,152 @@
+import sys
+import wave
+
+import pytest
+
+
+def _write_wav(path, samples, sample_rate):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+def test_file_source_wav(tmp_path):
+    import numpy
+
+    from enviroplus.audio import FileSource
+
+    samples = numpy.arange(-100, 100, dtype=numpy.int16) * 100
+    path = tmp_path / "noise.wav"
+    _write_wav(path, samples, 8000)
+
+    source = FileSource(path)
+    assert source.sample_rate == 8000
+    assert len(source) == 200
+
+    block = source.read(150, 8000, "int16")
+    assert block.shape == (150, 1)
+    numpy.testing.assert_array_equal(block[:, 0], samples[:150])
+
+    with pytest.raises(EOFError):
+        source.read(100, 8000, "int16")
+
+    source = FileSource(path, loop=True)
+    source.read(150, 8000, "int16")
+    block = source.read(100, 8000, "float32")
+    assert block.dtype == numpy.float32
+    numpy.testing.assert_allclose(block[:, 0], numpy.concatenate((samples[150:], samples[:50])) / 32768.0)
+
+    with pytest.raises(ValueError):
+        FileSource(path, sample_rate=16000)
+
+
+def test_file_source_npy(tmp_path):
+    import numpy
+
+    from enviroplus.audio import FileSource
+
+    path = tmp_path / "noise.npy"
+    numpy.save(path, numpy.linspace(-1, 1, 64, dtype=numpy.float32))
+
+    with pytest.raises(ValueError):
+        FileSource(path)
+
+    source = FileSource(path, sample_rate=16000)
+    block = source.read(64, 16000, "int16")
+    assert block.dtype == numpy.int16
+    assert block[0, 0] == -32768
+    assert block[-1, 0] == 32767
+
+
+def test_noise_file_source(tmp_path):
+    import numpy
+
+    from enviroplus.audio import FileSource
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 8000.0
+    samples = (numpy.sin(2 * numpy.pi * 1000 * t) * 16384).astype(numpy.int16)
+    path = tmp_path / "tone.wav"
+    _write_wav(path, samples, 8000)
+
+    with pytest.raises(ValueError):
+        Noise(sample_rate=16000, source=FileSource(path))
+
+    noise = Noise(sample_rate=8000, duration=0.5, dtype="int16", source=FileSource(path))
+    amps = noise.get_amplitudes_at_frequency_ranges([(990, 1010), (1990, 2010)])
+
+    assert amps[0] > 100 * amps[1]
+    assert "sounddevice" not in sys.modules
+
+
+def test_noise_tone_source_stream():
+    from enviroplus.audio import ToneSource
+    from enviroplus.noise import Noise
+
+    source = ToneSource(frequencies=(500.0,), realtime=False)
+    with Noise(sample_rate=8000, duration=0.125, source=source) as noise:
+        amps = noise.get_amplitudes_at_frequency_ranges([(490, 510), (990, 1010)])
+
+    assert not noise.running
+    assert amps[0] > 100 * amps[1]
+    assert "sounddevice" not in sys.modules
+
+
+def test_noise_file_stream_end(tmp_path):
+    import numpy
+
+    from enviroplus.audio import FileSource
+    from enviroplus.noise import Noise
+
+    samples = (numpy.random.default_rng(4).standard_normal(1000) * 4096).astype(numpy.int16)
+    path = tmp_path / "short.wav"
+    _write_wav(path, samples, 8000)
+
+    # 1000 frames is less than the 0.5 seconds a capture needs
+    noise = Noise(sample_rate=8000, duration=0.5, dtype="int16", source=FileSource(path, realtime=False))
+    noise.start()
+    with pytest.raises(EOFError):
+        noise.get_noise_profile()
+    assert not noise.running
+
+    # The spectrogram iterator ends with the stream rather than waiting forever
+    assert list(noise.iter_spectrogram(frames=8, hop=256)) == []
+    noise.stop()
+
+    noise = Noise(sample_rate=8000, duration=0.5, segment=256, dtype="int16", source=FileSource(path, realtime=False))
+    noise.start()
+    assert len(list(noise.iter_spectrogram(frames=8, hop=256))) == (1000 - 256) // 256 + 1
+    noise.stop()
+
+
+@pytest.mark.parametrize("settings", [{}, {"method": "welch", "segment": 256, "decimate": 2}])
+def test_noise_analyse_file(tmp_path, settings):
+    import numpy
+
+    from enviroplus.audio import FileSource
+    from enviroplus.noise import Noise
+
+    samples = (numpy.random.default_rng(1).standard_normal(20000) * 4096).astype(numpy.int16)
+    path = tmp_path / "noise.wav"
+    _write_wav(path, samples, 8000)
+
+    noise = Noise(sample_rate=8000, duration=0.25, dtype="int16", **settings)
+    profiles = list(noise.analyse_file(path, batch=3))
+    assert len(profiles) == (20000 - noise._history) // 2000
+    assert [time for time, _ in profiles[:2]] == [0.0, 0.25]
+
+    ranges = [(100, 500), (1000, 2000)]
+    amplitudes = list(noise.analyse_file(path, ranges=ranges, batch=3))
+    assert list(noise.analyse_file(path, ranges=ranges, workers=2))[-1][1].tolist() == amplitudes[-1][1].tolist()
+
+    # Each block matches a live capture of the same audio
+    live = Noise(sample_rate=8000, duration=0.25, dtype="int16", source=FileSource(path), **settings)
+    for index in range(len(profiles)):
+        live.source.position = index * 2000
+        numpy.testing.assert_allclose(profiles[index][1], live.get_noise_profile(), rtol=1e-5)
+        live.source.position = index * 2000
+        numpy.testing.assert_allclose(amplitudes[index][1], live.get_amplitudes_at_frequency_ranges(ranges), rtol=1e-5)
+
+    assert "sounddevice" not in sys.modules
@@ -0,0 +1,31 @@
+def test_cpu_temperature(tmp_path):
+    from enviroplus.cpu import CPUTemperature
+
+    path = tmp_path / "temp"
+    path.write_text("48312\n")
+
+    with CPUTemperature(str(path), max_age=60.0) as sensor:
+        assert sensor.read() == 48.312
+
+        path.write_text("51000\n")
+        assert sensor.read() == 48.312
+        assert sensor.read(max_age=0) == 51.0
+
+    assert sensor._fd is None
+
+
+def test_get_cpu_temperature(tmp_path):
+    from enviroplus import cpu
+
+    path = tmp_path / "temp"
+    path.write_text("40000\n")
+
+    cpu._sensor = cpu.CPUTemperature(str(path))
+    try:
+        assert cpu.get_cpu_temperature() == 40.0
+        path.write_text("41500\n")
+        assert cpu.get_cpu_temperature(max_age=60.0) == 40.0
+        assert cpu.get_cpu_temperature() == 41.5
+    finally:
+        cpu._sensor.close()
+        cpu._sensor = None
@@ -0,0 +1,51 @@
+import colorsys
+
+
+def test_hue_lut():
+    from enviroplus.display import HUE_LUT
+
+    assert HUE_LUT.shape == (256, 3)
+    assert HUE_LUT[-1].tolist() == [int(x * 255.0) for x in colorsys.hsv_to_rgb(0.0, 1.0, 1.0)]
+    assert HUE_LUT[0].tolist() == [int(x * 255.0) for x in colorsys.hsv_to_rgb(0.6, 1.0, 1.0)]
+
+
+def test_strip_chart():
+    import numpy
+
+    from enviroplus.display import HUE_LUT, StripChart
+
+    chart = StripChart(160, 80, top=25)
+
+    frame = chart.render([])
+    assert frame.shape == (80, 160, 3)
+    assert (frame == 255).all()
+
+    values = numpy.arange(200.0)
+    frame = chart.render(values)
+
+    # Only the most recent 160 values are drawn, scaled between their min and max
+    levels = (values[-160:] - 40 + 1) / (199 - 40 + 1)
+    assert (frame[:25] == 255).all()
+    assert frame[40, 0].tolist() == HUE_LUT[int(numpy.rint(levels[0] * 255))].tolist()
+
+    # The line sits at the top of the chart for the maximum
+    assert frame[25, 159].tolist() == [0, 0, 0]
+    assert frame[26, 159].tolist() == [0, 0, 0]
+    assert frame[27, 159].tolist() == HUE_LUT[255].tolist()
+
+    # Fewer values than columns leave the rest as background
+    frame = chart.render([1.0, 2.0])
+    assert (frame[:, 2:] == 255).all()
+
+
+def test_strip_chart_history():
+    from enviroplus.display import StripChart
+    from enviroplus.history import History
+
+    chart = StripChart(160, 80, top=25)
+    history = History(160, initial=1)
+    for value in range(50):
+        history.append(value)
+
+    expected = chart.render(history.values()).copy()
+    assert (chart.render(history.values(), history.min(), history.max()) == expected).all()
@@ -0,0 +1,88 @@
+import pytest
+
+
+def test_history():
+    import numpy
+
+    from enviroplus.history import History
+
+    history = History(5)
+    assert len(history) == 0
+    assert history.mean() is None and history.min() is None and history.max() is None and history.latest() is None
+
+    history.append(3)
+    history.append(1)
+    assert history.values().tolist() == [3.0, 1.0]
+    assert not history.full
+
+    readings = numpy.random.default_rng(2).standard_normal(100) * 10
+    history = History(7)
+    for index, reading in enumerate(readings):
+        history.append(reading)
+        window = readings[max(0, index - 6) : index + 1]
+        assert history.values().tolist() == window.tolist()
+        assert history.latest() == reading
+        assert history.min() == window.min()
+        assert history.max() == window.max()
+        assert history.mean() == pytest.approx(window.mean())
+
+    assert history.full
+    assert len(history) == 7
+
+
+def test_history_initial():
+    from enviroplus.history import History
+
+    history = History(4, initial=1)
+    assert history.values().tolist() == [1.0] * 4
+    history.append(5)
+    assert history.mean() == 2.0
+    assert history.max() == 5.0
+    assert history.min() == 1.0
+
+    with pytest.raises(ValueError):
+        History(0)
+
+
+def test_trend():
+    import numpy
+
+    from enviroplus.history import Trend
+
+    trend = Trend(50)
+    assert trend.mean() is None and trend.slope() is None and trend.r_squared() is None
+    trend.append(1.7e9, 1013.0)
+    assert trend.mean() == 1013.0
+    assert trend.slope() is None
+
+    rng = numpy.random.default_rng(3)
+    times = 1.7e9 + numpy.arange(500, dtype=numpy.float64)
+    pressures = 1013.0 + numpy.sin(times / 60.0) + rng.standard_normal(500) * 0.1
+    trend = Trend(50)
+    for index, (t, pressure) in enumerate(zip(times, pressures)):
+        trend.append(t, pressure)
+        if index < 2:
+            continue
+        window_t = times[max(0, index - 49) : index + 1]
+        window_p = pressures[max(0, index - 49) : index + 1]
+        slope, intercept = numpy.polyfit(window_t - window_t[0], window_p, 1)
+        r_squared = 1 - numpy.var(slope * (window_t - window_t[0]) + intercept - window_p) / numpy.var(window_p)
+        assert trend.slope() == pytest.approx(slope, rel=1e-6, abs=1e-9)
+        assert trend.change_per_hour() == pytest.approx(slope * 3600, rel=1e-6, abs=1e-6)
+        assert trend.r_squared() == pytest.approx(r_squared, rel=1e-6, abs=1e-9)
+        assert trend.mean() == pytest.approx(window_p.mean())
+
+    assert trend.full
+
+
+def test_trend_flat():
+    from enviroplus.history import Trend
+
+    trend = Trend(3)
+    for t in range(5):
+        trend.append(t, 1000.0)
+    assert trend.slope() == 0.0
+    assert trend.r_squared() == 0.0
+
+    with pytest.raises(ValueError):
+        Trend(1)
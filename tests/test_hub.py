@@ -0,0 +1,95 @@
+import threading
+import time
+
+
+def test_hub_serves_readings(tmp_path):
+    from enviroplus import hub
+
+    values = {"temperature": 21.5}
+    server = hub.Hub(str(tmp_path / "hub.sock"), str(tmp_path / "snapshot.json"))
+    server.add_sensor("bme280", 1.0, lambda: values)
+
+    with server:
+        server.update("bme280")
+
+        snapshot = hub.read(server.socket_path)
+        assert snapshot["sensors"]["bme280"]["temperature"] == 21.5
+        assert hub.read_snapshot(server.snapshot_path)["sensors"] == snapshot["sensors"]
+
+        updates = hub.watch(server.socket_path)
+        assert next(updates)["sensors"]["bme280"]["temperature"] == 21.5
+
+        values["temperature"] = 22.0
+        server.update("bme280")
+        assert next(updates)["sensors"]["bme280"]["temperature"] == 22.0
+        updates.close()
+
+
+def test_hub_run(tmp_path):
+    from enviroplus import hub
+
+    counts = {"fast": 0, "slow": 0}
+
+    def read(name):
+        counts[name] += 1
+        if name == "slow" and counts[name] > 1:
+            raise OSError("Sensor unplugged")
+        return {"count": counts[name]}
+
+    server = hub.Hub(socket_path=None)
+    server.add_sensor("fast", 0.01, lambda: read("fast"))
+    server.add_sensor("slow", 0.2, lambda: read("slow"))
+    refreshes = []
+    server.every(0.05, lambda: refreshes.append(1) or 1 / 0)
+
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    time.sleep(0.3)
+    server.stop()
+    thread.join()
+
+    assert counts["fast"] > 5 * counts["slow"]
+    # A failing housekeeping task is logged and keeps running
+    assert len(refreshes) > 1
+    # The failed read keeps the last good reading
+    assert server.snapshot()["sensors"]["slow"]["count"] == 1
+
+
+def test_hub_pms5003_reader(pms5003):
+    import argparse
+
+    from enviroplus import hub
+
+    frame = pms5003.PMS5003.return_value.read.return_value
+    frame.pm_ug_per_m3.side_effect = lambda size: {1.0: 1, 2.5: 2, 10: 3}[size]
+
+    def read():
+        time.sleep(0.01)
+        return frame
+
+    pms5003.PMS5003.return_value.read.side_effect = read
+
+    server = hub.Hub(socket_path=None)
+    stoppers = hub._add_sensors(server, argparse.Namespace(bme280=0, ltr559=0, gas=0, pms5003=1.0, noise=0))
+    try:
+        assert server.sensors == ("pms5003",)
+        deadline = time.monotonic() + 1.0
+        while "pms5003" not in server.snapshot()["sensors"] and time.monotonic() < deadline:
+            server.update("pms5003")
+            time.sleep(0.01)
+        assert server.snapshot()["sensors"]["pms5003"]["pm25"] == 2
+    finally:
+        for stop in stoppers:
+            stop()
+
+
+def test_hub_ltr559_missing(ltr559):
+    import argparse
+
+    from enviroplus import hub
+
+    ltr559.LTR559.side_effect = RuntimeError("LTR559 not found")
+
+    server = hub.Hub(socket_path=None)
+    assert hub._add_sensors(server, argparse.Namespace(bme280=0, ltr559=1.0, gas=0, pms5003=0, noise=0)) == []
+    assert server.sensors == ()
@@ -14,7 +14,7 @@ def test_noise_get_amplitudes_at_frequency_ranges(sounddevice, numpy):
     noise = Noise(sample_rate=16000, duration=0.1)
     noise.get_amplitudes_at_frequency_ranges([(100, 500), (501, 1000)])
 
-    sounddevice.rec.assert_called_with(0.1 * 16000, device="adau7002", samplerate=16000, blocking=True, channels=1, dtype="float64")
+    sounddevice.rec.assert_called_with(0.1 * 16000, device="adau7002", samplerate=16000, blocking=True, channels=1, dtype="float32")
 
 
 def test_noise_get_noise_profile(sounddevice, numpy):
@@ -25,7 +25,7 @@ def test_noise_get_noise_profile(sounddevice, numpy):
     noise = Noise(sample_rate=16000, duration=0.1)
     amp_low, amp_mid, amp_high, amp_total = noise.get_noise_profile(noise_floor=100, low=0.12, mid=0.36, high=None)
 
-    sounddevice.rec.assert_called_with(0.1 * 16000, device="adau7002", samplerate=16000, blocking=True, channels=1, dtype="float64")
+    sounddevice.rec.assert_called_with(0.1 * 16000, device="adau7002", samplerate=16000, blocking=True, channels=1, dtype="float32")
 
     assert amp_total == 10.0
 
@@ -39,3 +39,284 @@ def test_get_amplitude_at_frequency_range(sounddevice, numpy):
 
     with pytest.raises(ValueError):
         noise.get_amplitude_at_frequency_range(0, 16000)
+
+
+def test_noise_stream(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    noise = Noise(sample_rate=8000, duration=0.0125)
+    noise.start(buffer_duration=0.03125)
+
+    callback = sounddevice.InputStream.call_args.kwargs["callback"]
+    for block in range(4):
+        callback(numpy.arange(block * 64, (block + 1) * 64, dtype="float64").reshape(-1, 1), 64, None, None)
+
+    recording = noise._record()
+    assert recording.shape == (100, 1)
+    assert list(recording[:, 0]) == list(range(156, 256))
+
+    noise.get_noise_profile(noise_floor=10)
+    sounddevice.rec.assert_not_called()
+
+    noise.stop()
+    sounddevice.InputStream.return_value.close.assert_called_once()
+
+
+def test_noise_profile_matches_reference(sounddevice):
+    import numpy
+
+    from enviroplus import noise as noise_module
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(4000) / 8000.0
+    sounddevice.rec.return_value = numpy.sin(2 * numpy.pi * 440 * t).reshape(-1, 1)
+
+    noise = Noise(sample_rate=8000, duration=0.5, fft_size=8000)
+    profile = noise.get_noise_profile(noise_floor=100)
+    profile_again = noise.get_noise_profile(noise_floor=100)
+
+    magnitude = numpy.abs(numpy.fft.rfft(sounddevice.rec.return_value[:, 0], n=8000))
+    expected = numpy.mean(magnitude[100:568]), numpy.mean(magnitude[568:1972]), numpy.mean(magnitude[1972:4000])
+
+    assert numpy.allclose(profile[:3], expected)
+    assert profile == profile_again
+    assert noise_module._profile_bins.cache_info().hits >= 1
+
+
+def test_noise_get_amplitudes_at_frequency_ranges_vectorised(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    rng = numpy.random.default_rng(0)
+    sounddevice.rec.return_value = rng.standard_normal((1600, 1))
+
+    noise = Noise(sample_rate=16000, duration=0.1, fft_size=16000)
+    ranges = [(100, 500), (501, 1000), (7000, 9000)]
+    result = noise.get_amplitudes_at_frequency_ranges(ranges)
+
+    magnitude = numpy.abs(numpy.fft.rfft(sounddevice.rec.return_value[:, 0], n=16000))
+    expected = [numpy.mean(magnitude[start:end]) for start, end in ranges]
+
+    assert isinstance(result, numpy.ndarray)
+    assert numpy.allclose(result, expected)
+
+
+def test_noise_fft_size(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    assert Noise(sample_rate=16000, duration=0.5)._fft_length() == 8000
+    assert Noise(sample_rate=16000, duration=0.5, fft_size=4096)._fft_length() == 4096
+    assert Noise(sample_rate=16000, duration=1.5, fft_size="hz")._fft_length() == 32000
+
+    with pytest.raises(ValueError):
+        Noise(fft_size="fast")
+
+    t = numpy.arange(8000) / 16000.0
+    sounddevice.rec.return_value = numpy.sin(2 * numpy.pi * 1000 * t).reshape(-1, 1)
+
+    amps = Noise(sample_rate=16000, duration=0.5).get_amplitudes_at_frequency_ranges([(900, 990), (990, 1010), (1010, 1100)])
+
+    assert amps.argmax() == 1
+    assert numpy.isclose(amps[1], 400.0)
+
+
+def test_noise_welch(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 16000.0
+    rng = numpy.random.default_rng(1)
+    tone = numpy.sin(2 * numpy.pi * 1000 * t)
+    sounddevice.rec.return_value = (tone + 0.1 * rng.standard_normal(8000)).reshape(-1, 1)
+
+    noise = Noise(sample_rate=16000, duration=0.5, method="welch", segment=1024, overlap=0.5)
+    assert noise._fft_length() == 1024
+
+    amps = noise.get_amplitudes_at_frequency_ranges([(900, 980), (984, 1016), (1020, 1100)])
+    assert amps.argmax() == 1
+
+    low, mid, _, _ = noise.get_noise_profile(noise_floor=100)
+    assert low > mid > 0
+
+    with pytest.raises(ValueError):
+        Noise(method="welch", overlap=1.0)
+
+    with pytest.raises(ValueError):
+        Noise(method="welch", window="kaiser")
+
+    sounddevice.rec.return_value = numpy.zeros((160, 1))
+    with pytest.raises(ValueError):
+        Noise(sample_rate=16000, duration=0.01, method="welch", segment=1024).get_noise_profile()
+
+
+def test_noise_dtype(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 16000.0
+    tone = numpy.sin(2 * numpy.pi * 1000 * t)
+
+    sounddevice.rec.return_value = (tone * (1 << 30)).astype(numpy.int32).reshape(-1, 1)
+    noise = Noise(sample_rate=16000, duration=0.5, dtype="int32")
+    recording = noise._record()
+
+    assert sounddevice.rec.call_args.kwargs["dtype"] == "int32"
+    assert recording.dtype == numpy.float32
+    assert numpy.allclose(recording[:, 0], tone * 0.5, atol=1e-6)
+    assert noise._magnitude(recording).dtype == numpy.float32
+
+    sounddevice.rec.return_value = tone.astype(numpy.float32).reshape(-1, 1)
+    float32 = Noise(sample_rate=16000, duration=0.5).get_amplitudes_at_frequency_ranges([(990, 1010)])
+    float64 = Noise(sample_rate=16000, duration=0.5, dtype="float64").get_amplitudes_at_frequency_ranges([(990, 1010)])
+    assert numpy.allclose(float32, float64, rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        Noise(dtype="int8")
+
+
+def test_noise_spectrogram(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 16000.0
+    sounddevice.rec.return_value = numpy.sin(2 * numpy.pi * 1000 * t).astype(numpy.float32).reshape(-1, 1)
+
+    noise = Noise(sample_rate=16000, duration=0.5, segment=256)
+    result = noise.spectrogram(frames=16, hop=128)
+
+    assert result.shape == (16, 129)
+    assert (result.argmax(axis=1) == 16).all()
+
+    # Same scale as a Welch spectrum of the same segments
+    welch = Noise(sample_rate=16000, duration=0.5, segment=256, overlap=0.5, method="welch")
+    spectrum = welch._welch(sounddevice.rec.return_value[:, 0], 256)
+    assert result[:, 16].mean() == pytest.approx(spectrum[16], rel=0.05)
+
+
+def test_noise_iter_spectrogram(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    noise = Noise(sample_rate=16000, duration=0.1, segment=256)
+
+    with pytest.raises(RuntimeError):
+        next(noise.iter_spectrogram())
+
+    noise.start(buffer_duration=0.1)
+    callback = sounddevice.InputStream.call_args.kwargs["callback"]
+    t = numpy.arange(4096) / 16000.0
+    audio = numpy.sin(2 * numpy.pi * 2000 * t).astype(numpy.float32).reshape(-1, 1)
+
+    columns = noise.iter_spectrogram(frames=8, hop=256)
+    callback(audio[:1024], 1024, None, None)
+    first = [next(columns).argmax() for _ in range(4)]
+
+    callback(audio[1024:2048], 1024, None, None)
+    second = [next(columns).argmax() for _ in range(4)]
+
+    assert first == second == [32] * 4
+    assert noise._spectrogram.position == 2048
+
+    noise.stop()
+    assert list(columns) == []
+
+
+def test_noise_get_level(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 16000.0
+    noise = Noise(sample_rate=16000, duration=0.5)
+
+    sounddevice.rec.return_value = numpy.sin(2 * numpy.pi * 1000 * t).astype(numpy.float32).reshape(-1, 1)
+    assert abs(noise.get_level("Z") + 3.01) < 0.05
+    assert abs(noise.get_level("A") + 3.01) < 0.05
+    assert abs(noise.get_level("A", calibration=100.0) - 96.99) < 0.05
+
+    sounddevice.rec.return_value = numpy.sin(2 * numpy.pi * 100 * t).astype(numpy.float32).reshape(-1, 1)
+    assert abs(noise.get_level("A") + 3.01 + 19.1) < 0.1
+    assert abs(noise.get_level("C") + 3.01 + 0.3) < 0.1
+
+    with pytest.raises(ValueError):
+        noise.get_level("B")
+
+
+def test_level_meter(sounddevice):
+    from enviroplus.noise import LevelMeter
+
+    meter = LevelMeter()
+    assert meter.leq is None
+
+    for _ in range(9):
+        meter.add(60.0, 1.0)
+    meter.add(70.0, 1.0)
+
+    assert abs(meter.leq - 62.79) < 0.01
+    assert meter.lmax == 70.0
+    assert meter.lmin == 60.0
+    assert abs(meter.l90 - 60.0) < 0.01
+    assert abs(meter.percentile(5) - 70.0) < 0.01
+
+    meter.reset()
+    assert meter.duration == 0.0
+
+
+def test_noise_get_octave_bands(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    t = numpy.arange(8000) / 16000.0
+    rng = numpy.random.default_rng(2)
+    sounddevice.rec.return_value = (numpy.sin(2 * numpy.pi * 1000 * t) + 0.01 * rng.standard_normal(8000)).astype(numpy.float32).reshape(-1, 1)
+
+    noise = Noise(sample_rate=16000, duration=0.5)
+    centres, levels = noise.get_octave_bands(fraction=3)
+
+    assert len(centres) == len(levels)
+    assert 25 < len(centres) < 35
+    assert numpy.isclose(centres[levels.argmax()], 1000.0)
+    assert abs(levels.max() + 3.01) < 0.1
+    assert numpy.isclose(10 * numpy.log10(numpy.sum(10 ** (levels / 10))), noise.get_level("Z"), atol=0.05)
+
+    centres, levels = noise.get_octave_bands(fraction=1)
+    assert numpy.allclose(centres[:3], [31.62, 63.1, 125.9], rtol=1e-3)
+
+    with pytest.raises(ValueError):
+        noise.get_octave_bands(fraction=0)
+
+
+def test_noise_decimate(sounddevice):
+    import numpy
+
+    from enviroplus.noise import Noise
+
+    with pytest.raises(ValueError):
+        Noise(sample_rate=12345)
+
+    with pytest.raises(ValueError):
+        Noise(sample_rate=16000, decimate=3)
+
+    noise = Noise(sample_rate=16000, duration=0.5, decimate=4)
+    assert noise.analysis_rate == 4000
+    assert noise._fft_length() == 2000
+
+    t = numpy.arange(8000 + noise._history) / 16000.0
+    sounddevice.rec.return_value = (numpy.sin(2 * numpy.pi * 500 * t) + numpy.sin(2 * numpy.pi * 3000 * t)).astype(numpy.float32).reshape(-1, 1)
+
+    amps = noise.get_amplitudes_at_frequency_ranges([(490, 510), (990, 1010)])
+
+    assert sounddevice.rec.call_args.args[0] == 8000 + noise._history
+    assert noise._record().shape == (2000, 1)
+    # 500Hz passes, the 3kHz tone would alias to 1kHz without the low-pass filter
+    assert amps[0] > 100 * amps[1]
@@ -0,0 +1,80 @@
+import threading
+import time
+from unittest import mock
+
+
+def _frame(pm25):
+    frame = mock.Mock()
+    frame.pm_ug_per_m3.side_effect = lambda size, atmospheric_environment=False: pm25
+    return frame
+
+
+def test_particulates_reader(pms5003):
+    from enviroplus.particulates import PMS5003Reader
+
+    done = threading.Event()
+    results = [_frame(10), pms5003.ReadTimeoutError("timeout"), RuntimeError("checksum"), _frame(20)]
+
+    def read():
+        if results:
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        done.set()
+        raise pms5003.SerialTimeoutError("no data")
+
+    sensor = mock.Mock()
+    sensor.read.side_effect = read
+    frames = []
+
+    with PMS5003Reader(sensor, callback=frames.append, retry_delay=0.01) as reader:
+        assert done.wait(1.0)
+        assert reader.latest().pm_ug_per_m3(2.5) == 20
+        assert reader.mean(60.0, 2.5) == 15.0
+
+    assert not reader.running
+    assert len(frames) == 2
+    assert reader.errors >= 3
+    sensor.reset.assert_called_once()
+
+
+def test_particulates_reader_latest_wait(pms5003):
+    from enviroplus.particulates import PMS5003Reader
+
+    reader = PMS5003Reader()
+    pms5003.PMS5003.return_value.read.return_value = _frame(5)
+    reader.start()
+    assert reader.latest(wait=True, timeout=1.0).pm_ug_per_m3(2.5) == 5
+    reader.stop()
+    pms5003.PMS5003.assert_called_once_with()
+
+
+def test_particulates_reader_serial_errors(pms5003):
+    from enviroplus.particulates import PMS5003Reader
+
+    done = threading.Event()
+    results = [_frame(10), OSError("Device disconnected"), pms5003.ReadTimeoutError("timeout"), _frame(20)]
+
+    def read():
+        if results:
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        done.set()
+        raise pms5003.SerialTimeoutError("no data")
+
+    sensor = mock.Mock()
+    sensor.read.side_effect = read
+    sensor.reset.side_effect = OSError("Device disconnected")
+
+    with PMS5003Reader(sensor, retry_delay=0.01) as reader:
+        assert done.wait(1.0)
+        assert reader.running
+        assert reader.latest().pm_ug_per_m3(2.5) == 20
+        assert reader.latest(max_age=60.0) is not None
+        time.sleep(0.01)
+        assert reader.latest(max_age=0.001) is None
+
+    assert reader.errors >= 4
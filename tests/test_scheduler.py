@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+
+def test_scheduler_rates():
+    from enviroplus.scheduler import Scheduler
+
+    scheduler = Scheduler()
+    calls = {"fast": 0, "slow": 0}
+
+    def count(name):
+        calls[name] += 1
+
+    scheduler.every(0.01, count, "fast")
+    slow = scheduler.every(0.1, count, "slow")
+    assert len(scheduler) == 2
+
+    threading.Timer(0.25, scheduler.cancel, (slow,)).start()
+    threading.Timer(0.35, scheduler.stop).start()
+    start = time.monotonic()
+    scheduler.run()
+
+    assert 0.3 < time.monotonic() - start < 1.0
+    assert calls["slow"] == 3
+    assert calls["fast"] > 5 * calls["slow"]
+    assert len(scheduler) == 1
+
+    # A stopped scheduler stays stopped
+    scheduler.run()
+
+
+def test_scheduler_wakes_for_new_task():
+    from enviroplus.scheduler import Scheduler
+
+    scheduler = Scheduler()
+    scheduler.every(10.0, lambda: None, delay=10.0)
+
+    called = threading.Event()
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    scheduler.every(10.0, called.set)
+
+    assert called.wait(1.0)
+    scheduler.stop()
+    thread.join(1.0)
+    assert not thread.is_alive()
+
+
+def test_scheduler_task_error():
+    from enviroplus.scheduler import Scheduler
+
+    def fail():
+        raise OSError("Sensor unplugged")
+
+    scheduler = Scheduler()
+    scheduler.every(0.01, fail)
+
+    with pytest.raises(OSError):
+        scheduler.run()
+
+    assert len(scheduler) == 1
+    assert scheduler.run_pending() > 0
+
+    with pytest.raises(ValueError):
+        scheduler.every(0, fail)
+
+
+def test_scheduler_stopped():
+    from enviroplus.scheduler import Scheduler
+
+    calls = []
+    scheduler = Scheduler()
+    scheduler.every(1.0, calls.append, "first")
+    scheduler.every(1.0, scheduler.stop)
+    scheduler.every(1.0, calls.append, "second")
+
+    # stop() from a task skips the rest of the due tasks
+    scheduler.run()
+    assert calls == ["first"]
+
+    # A stopped scheduler runs nothing
+    scheduler.run()
+    assert scheduler.run_pending() is not None
+    assert calls == ["first"]
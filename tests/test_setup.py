@@ -1,3 +1,5 @@
+from unittest import mock
+
 import pytest
 
 
@@ -92,3 +94,134 @@ def test_gas_cleanup(gpiod, gpiodevice, smbus):
 
     gas.setup()
     gas.cleanup()
+
+
+def test_gas_stream(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    stream = gas.stream(rate_hz=200, size=4)
+
+    reading = stream.latest(wait=True, timeout=1.0)
+    assert isinstance(reading.oxidising, float)
+    assert reading.timestamp is not None
+    assert gas.adc.get_mode() == "continuous"
+
+    readings = []
+    for reading in stream:
+        readings.append(reading)
+        if len(readings) == 3:
+            break
+
+    assert readings[0].timestamp <= readings[-1].timestamp
+    assert len(stream.readings()) <= 4
+    assert gas.read_all() is not None
+
+    gas.stop_stream()
+    assert not stream.running
+    assert gas.adc.get_mode() == "single"
+
+
+def test_gas_continuous_voltage_settles(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    gas.setup()
+
+    # The conversion in flight when the mux changes still uses the old channel,
+    # so a whole conversion period is not enough
+    with mock.patch.object(gas.time, "sleep") as sleep:
+        gas._get_continuous_voltage("in0/gnd")
+    assert sleep.call_args[0][0] >= 2 * gas._conversion_time
+
+
+def test_gas_stream_bus_error(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    gas.setup()
+
+    with mock.patch.object(gas.adc, "set_multiplexer", side_effect=OSError(121, "Remote I/O error")):
+        stream = gas.stream(rate_hz=200, size=4)
+        stream.max_age = 0.1
+
+        with pytest.raises(OSError):
+            gas.read_all()
+
+        assert stream.errors > 0
+        assert stream.running
+
+    # The stream carries on once the bus recovers
+    assert stream.latest(wait=True, timeout=1.0) is not None
+    assert gas.read_all() is not None
+
+    gas.stop_stream()
+    assert gas.adc.get_mode() == "single"
+
+
+def test_gas_read_channels(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    gas.setup()
+
+    with mock.patch.object(gas.adc, "get_voltage", wraps=gas.adc.get_voltage) as get_voltage:
+        result = gas.read_channels(("ox", "nh3"))
+
+    assert get_voltage.call_count == 2
+    assert isinstance(result.oxidising, float)
+    assert isinstance(result.nh3, float)
+    assert result.reducing is None
+    assert result.adc is None
+    assert "Reducing" not in str(result)
+
+    with pytest.raises(ValueError):
+        gas.read_channels(("co2",))
+
+
+def test_gas_read_adc_max_age(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    gas.setup()
+
+    gas.enable_adc(True)
+    gas.set_adc_gain(2.048)
+    gas.set_adc_max_age(60.0)
+
+    with mock.patch.object(gas.adc, "set_programmable_gain", wraps=gas.adc.set_programmable_gain) as set_programmable_gain:
+        assert gas.read_adc() == 0.255
+        assert gas.read_all().adc == 0.255
+        assert set_programmable_gain.call_count == 2
+
+        assert gas.refresh_adc() == 0.255
+        assert set_programmable_gain.call_count == 4
+
+    gas.set_adc_max_age(None)
+
+
+def test_gas_stream_refreshes_adc(gpiod, gpiodevice, smbus):
+    from enviroplus import gas
+
+    gas._is_setup = False
+    gas.setup()
+
+    gas.enable_adc(True)
+    gas.set_adc_gain(2.048)
+    gas.set_adc_max_age(float("inf"))
+
+    with mock.patch.object(gas.adc, "set_programmable_gain", wraps=gas.adc.set_programmable_gain) as set_programmable_gain:
+        with gas.stream(rate_hz=200, size=4) as stream:
+            readings = []
+            for reading in stream:
+                readings.append(reading)
+                if len(readings) == 5:
+                    break
+            assert gas.read_all().adc == readings[0].adc
+
+        # Sampled once by the stream thread, never inside a reading
+        assert set_programmable_gain.call_count == 2
+
+    gas.stop_stream()
+    gas.enable_adc(False)
+    gas.set_adc_max_age(None)
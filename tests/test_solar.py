@@ -0,0 +1,50 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+
+def fake_sun(observer, date, tzinfo):
+    return {
+        "sunrise": datetime.combine(date, time(6, 0), tzinfo),
+        "sunset": datetime.combine(date, time(18, 0), tzinfo),
+    }
+
+
+def test_sun_times(astral):
+    astral.sun.sun.side_effect = fake_sun
+    from enviroplus.solar import SunTimes
+
+    sun_times = SunTimes("Sheffield", "UTC")
+    astral.geocoder.lookup.assert_called_once()
+
+    progress, period, day, local_dt = sun_times.period(datetime(2024, 6, 1, 9, 0, tzinfo=timezone.utc))
+    assert day
+    assert progress == 3 * 3600
+    assert period == 12 * 3600
+    assert local_dt.date() == date(2024, 6, 1)
+    assert astral.sun.sun.call_count == 3
+
+    progress, period, day, _ = sun_times.period(datetime(2024, 6, 1, 20, 0, tzinfo=timezone.utc))
+    assert not day
+    assert progress == 2 * 3600
+    assert period == 12 * 3600
+    assert astral.sun.sun.call_count == 3
+
+    progress, _, day, _ = sun_times.period(datetime(2024, 6, 2, 3, 0, tzinfo=timezone.utc))
+    assert not day
+    assert progress == 9 * 3600
+    assert astral.sun.sun.call_count == 6
+    assert [call.kwargs["date"] for call in astral.sun.sun.call_args_list[3:]] == [date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 3)]
+
+
+def test_sun_period(astral):
+    astral.sun.sun.side_effect = fake_sun
+    from enviroplus import solar
+
+    now = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+    try:
+        for minute in range(5):
+            solar.sun_period("Sheffield", "Europe/London", now + timedelta(minutes=minute))
+        assert astral.geocoder.lookup.call_count == 1
+        assert astral.geocoder.database.call_count == 1
+        assert astral.sun.sun.call_count == 3
+    finally:
+        solar._cache.clear()